@@ -1,89 +1,58 @@
 import asyncio
-import json
-import glob
+import atexit
 import logging
 import argparse
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
-from colorama import Fore, Style, init
 
+from ..common.ansi import Fore
 from ..common.config import FanControlConfig
-
-init(autoreset=True)  # Initialize colorama
-
-
-# Custom formatter for colored output
-class ColoredFormatter(logging.Formatter):
-    FORMATS = {
-        logging.DEBUG: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.CYAN
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.INFO: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.GREEN
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.WARNING: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.YELLOW
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.ERROR: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.RED
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.CRITICAL: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.RED
-        + Style.BRIGHT
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-    }
-
-    def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt, datefmt="%Y-%m-%d %H:%M:%S")
-        return formatter.format(record)
-
-
-# Setup logging with colored output
-logging.basicConfig(
-    level=logging.INFO, format="%(message)s", handlers=[logging.NullHandler()]
+from ..common.hwmon import HWMON_ROOT, scan_hwmon
+from ..common.log import configure_logging, get_colored_logger
+from ..common.protocol import (
+    CLIENT_TIMEOUT,
+    FrameEncoder,
+    encode_hello,
+    encode_message,
 )
-logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-handler.setFormatter(ColoredFormatter())
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
+
+logger = get_colored_logger(__name__)
+
+
+# Adaptive polling: back off by _BACKOFF_FACTOR once temperatures changed less
+# than _STABLE_RATE mK/s for _STABLE_TICKS consecutive polls
+_STABLE_RATE = 500
+_STABLE_TICKS = 3
+_BACKOFF_FACTOR = 1.5
+
+# Reconnect delays double from 1s up to _RECONNECT_MAX_DELAY seconds, plus up
+# to _RECONNECT_JITTER seconds so clients restarted together don't retry in sync
+_RECONNECT_MAX_DELAY = 30
+_RECONNECT_JITTER = 0.5
+
+# With at least this many sensors, reads run in parallel on a thread pool.
+# amdgpu temperature reads query the GPU firmware and can block for a while.
+_THREADED_READ_MIN = 4
+_THREADED_READ_WORKERS = 8
+
+
+def _read_sensor(fd: int) -> int:
+    """Read a sysfs temperature value in mK from an open descriptor"""
+    # int() accepts the trailing newline of the sysfs value
+    return int(os.pread(fd, 16, 0))
 
 
 class TemperatureMonitor:
+    # Auto-detected sensor paths per hwmon root, shared by all instances so
+    # sysfs is only scanned once per process
+    _sensor_cache: Dict[str, Dict[str, Path]] = {}
+
     def __init__(self, config: FanControlConfig, gpu_paths: Optional[List[str]] = None):
         self.config = config
-        self.gpu_temps = {}  # Changed from list to dict
+        self.gpu_temps: Dict[str, Path] = {}  # Changed from list to dict
 
         # First try command line paths
         if gpu_paths:
@@ -91,60 +60,211 @@ class TemperatureMonitor:
                 if Path(path).exists():
                     self.gpu_temps[f"gpu{i}"] = Path(path)
                 else:
-                    logger.error(f"Temperature sensor not found: {path}")
+                    logger.error("Temperature sensor not found: %s", path)
 
         # Then try config file paths
         elif self.config.gpus:
             for gpu_id, gpu_config in self.config.gpus.items():
-                path = Path(gpu_config["temp_path"])
-                if path.exists():
-                    self.gpu_temps[gpu_id] = path
-                    logger.info(f"Using temperature sensor for {gpu_id}: {path}")
+                temp_path = Path(gpu_config["temp_path"])
+                if temp_path.exists():
+                    self.gpu_temps[gpu_id] = temp_path
+                    logger.info(
+                        "Using temperature sensor for %s: %s", gpu_id, temp_path
+                    )
                 else:
-                    logger.error(f"Temperature sensor not found for {gpu_id}: {path}")
+                    logger.error(
+                        "Temperature sensor not found for %s: %s", gpu_id, temp_path
+                    )
 
         # Finally try auto-detection
         if not self.gpu_temps:
             logger.info("No GPU paths configured, attempting auto-detection")
-            pattern = "/sys/class/hwmon/hwmon*/temp1_input"
-            for i, path in enumerate(glob.glob(pattern)):
-                self.gpu_temps[f"gpu{i}"] = Path(path)
+            self.gpu_temps.update(self._detect_sensors())
+
+        # Encoded sensor paths, kept for reopening a sensor after a failed read
+        self._raw_paths = {
+            gpu_id: os.fsencode(path) for gpu_id, path in self.gpu_temps.items()
+        }
 
+        # Open every sensor once, each poll is then a single pread()
+        self._fds: Dict[str, int] = {}
+        for gpu_id in list(self.gpu_temps):
+            try:
+                self._fds[gpu_id] = os.open(self._raw_paths[gpu_id], os.O_RDONLY)
+            except OSError as e:
+                logger.error("Failed to open temperature sensor for %s: %s", gpu_id, e)
+                del self.gpu_temps[gpu_id]
+
+        # Read many sensors in parallel instead of one after another
+        self._pool: Optional[ThreadPoolExecutor] = None
+        if len(self._fds) >= _THREADED_READ_MIN:
+            self._pool = ThreadPoolExecutor(
+                max_workers=min(_THREADED_READ_WORKERS, len(self._fds)),
+                thread_name_prefix="sensor",
+            )
+
+        # Nothing was opened in that case, every failed open is dropped above
         if not self.gpu_temps:
             raise ValueError("No valid temperature sensor paths found")
 
-        logger.info(f"Monitoring {len(self.gpu_temps)} temperature sensors")
+        # Release the descriptors even if the monitor is never closed explicitly
+        atexit.register(self.close)
+
+        logger.info("Monitoring %s temperature sensors", len(self.gpu_temps))
         self.total_reconnects = 0
+        # Sequence number of the next temperature frame
+        self._seq = 0
+
+        # Adaptive polling state
+        self._min_interval = config.MIN_INTERVAL or config.SLEEP_INTERVAL
+        self._max_interval = max(
+            config.MAX_INTERVAL or self._min_interval, self._min_interval
+        )
+        self._interval = self._min_interval
+        self._stable_ticks = 0
+        self._prev_sample: Optional[Tuple[float, Dict[str, Optional[int]]]] = None
 
     def _is_gpu_temp(self, hwmon_path: Path) -> bool:
         """Check if hwmon path belongs to a GPU"""
         try:
-            name_file = hwmon_path / "name"
-            if name_file.exists():
-                name = name_file.read_text().strip()
-                return "amdgpu" in name.lower()
-            return False
+            name = (hwmon_path / "name").read_text().strip()
+            return "amdgpu" in name.lower()
         except (IOError, OSError):
             return False
 
-    async def read_temperatures(self) -> Dict[str, Optional[int]]:
-        """Read current temperatures from all monitored GPUs"""
-        temperatures = {}
-
-        for gpu_id, temp_path in self.gpu_temps.items():
-            try:
-                if temp_path.exists():
-                    temp = int(temp_path.read_text().strip())
-                    temperatures[gpu_id] = temp
-                    logger.debug(f"{Fore.CYAN}{gpu_id}: {temp/1000:.1f}°C")
-                else:
-                    temperatures[gpu_id] = None
-                    logger.error(f"Temperature file not found: {temp_path}")
-            except (ValueError, IOError) as e:
+    def _detect_sensors(self) -> Dict[str, Path]:
+        """Find the temperature sensors of all GPU hwmon devices
+
+        Returns:
+            Dict mapping generated GPU IDs to temp1_input paths
+        """
+        sensors = self._sensor_cache.get(HWMON_ROOT)
+        if sensors is not None:
+            return sensors
+
+        sensors = {}
+        for hwmon_path, names in scan_hwmon(HWMON_ROOT):
+            if (
+                "temp1_input" in names
+                and "name" in names
+                and self._is_gpu_temp(Path(hwmon_path))
+            ):
+                sensors[f"gpu{len(sensors)}"] = Path(hwmon_path, "temp1_input")
+        # Keep scanning on later attempts while no GPU was found
+        if sensors:
+            self._sensor_cache[HWMON_ROOT] = sensors
+        return sensors
+
+    async def read_temperatures(self) -> Tuple[Dict[str, Optional[int]], bool]:
+        """Read current temperatures from all monitored GPUs
+
+        Returns:
+            Dict mapping GPU IDs to temperatures in mK, None for failed reads,
+            and whether at least one read succeeded
+        """
+        temperatures: Dict[str, Optional[int]] = {}
+        has_valid = False
+        # Skip building the per-sensor debug messages unless they are emitted
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        if self._pool is not None:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(self._pool, _read_sensor, fd)
+                    for fd in self._fds.values()
+                ),
+                return_exceptions=True,
+            )
+        else:
+            results = []
+            for fd in self._fds.values():
+                try:
+                    results.append(_read_sensor(fd))
+                except (ValueError, IOError) as e:
+                    results.append(e)
+
+        for gpu_id, result in zip(self._fds, results):
+            if isinstance(result, (ValueError, IOError)):
                 temperatures[gpu_id] = None
-                logger.error(f"Failed to read temperature for {gpu_id}: {e}")
-
-        return temperatures
+                logger.error("Failed to read temperature for %s: %s", gpu_id, result)
+                if isinstance(result, IOError):
+                    self._reopen_sensor(gpu_id)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                temperatures[gpu_id] = result
+                has_valid = True
+                if debug:
+                    logger.debug("%s%s: %.1f°C", Fore.CYAN, gpu_id, result / 1000)
+
+        return temperatures, has_valid
+
+    def _reopen_sensor(self, gpu_id: str) -> None:
+        """Replace the descriptor of a sensor whose read failed
+
+        A descriptor can go stale when the driver recreates its hwmon device,
+        e.g. after a GPU reset. The old descriptor is kept if reopening fails.
+        """
+        try:
+            fd = os.open(self._raw_paths[gpu_id], os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.close(self._fds[gpu_id])
+        except OSError:
+            pass
+        self._fds[gpu_id] = fd
+
+    def close(self) -> None:
+        """Close the persistent temperature sensor file descriptors"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for gpu_id, fd in self._fds.items():
+            try:
+                os.close(fd)
+            except OSError as e:
+                logger.error("Failed to close temperature sensor for %s: %s", gpu_id, e)
+        self._fds.clear()
+        atexit.unregister(self.close)
+
+    def _next_interval(self, temps: Dict[str, Optional[int]], now: float) -> float:
+        """Adapt the polling interval to how fast temperatures change
+
+        Args:
+            temps: Latest temperature readings
+            now: Time of the readings in seconds
+
+        Returns:
+            Seconds to wait before the next poll
+        """
+        if self._max_interval <= self._min_interval:
+            return self._min_interval
+
+        prev = self._prev_sample
+        self._prev_sample = (now, temps)
+        if prev is None or now <= prev[0]:
+            return self._interval
+
+        prev_time, prev_temps = prev
+        delta = 0
+        for gpu_id, temp in temps.items():
+            prev_temp = prev_temps.get(gpu_id)
+            if temp is not None and prev_temp is not None:
+                delta = max(delta, abs(temp - prev_temp))
+
+        if delta / (now - prev_time) < _STABLE_RATE:
+            self._stable_ticks += 1
+            if self._stable_ticks >= _STABLE_TICKS:
+                self._interval = min(
+                    self._max_interval, self._interval * _BACKOFF_FACTOR
+                )
+        else:
+            # Temperatures are moving, poll at full speed again
+            self._stable_ticks = 0
+            self._interval = self._min_interval
+        return self._interval
 
     async def connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
         """Connect to the fan control server with retries"""
@@ -158,35 +278,94 @@ class TemperatureMonitor:
                 if attempt > 1:
                     self.total_reconnects += 1
                     logger.info(
-                        f"{Fore.GREEN}Reconnected after {attempt} attempts "
-                        f"(Total reconnects: {self.total_reconnects})"
+                        "%sReconnected after %s attempts (Total reconnects: %s)",
+                        Fore.GREEN,
+                        attempt,
+                        self.total_reconnects,
                     )
                 return reader, writer
             except (ConnectionRefusedError, OSError) as e:
                 if attempt == 1:
-                    logger.error(f"{Fore.RED}Failed to connect: {e}")
-                await asyncio.sleep(min(30, attempt))
+                    logger.error("%sFailed to connect: %s", Fore.RED, e)
+                elif attempt % 10 == 0:
+                    logger.error(
+                        "%sFailed to connect after %s attempts: %s",
+                        Fore.RED,
+                        attempt,
+                        e,
+                    )
+                delay = min(_RECONNECT_MAX_DELAY, 2 ** min(attempt - 1, 5))
+                await asyncio.sleep(delay + random.uniform(0, _RECONNECT_JITTER))
 
-    async def monitor_loop(self):
+    async def monitor_loop(self) -> None:
         """Main monitoring loop"""
         reconnect = True
         while reconnect:
             try:
                 reader, writer = await self.connect()
 
+                # Announce the GPU order once, then stream binary frames. The
+                # handshake goes out with the first batch in a single send().
+                gpu_ids = list(self.gpu_temps)
+                binary = self.config.PROTO_VERSION >= 2
+                encoder = FrameEncoder(len(gpu_ids))
+                pending: List[bytes] = [encode_hello(gpu_ids)] if binary else []
+                # Frames in pending and the time the oldest one was sampled
+                batched = 0
+                batch_start = 0.0
+                batch_size = self.config.BATCH_SIZE
+                batch_max = self.config.BATCH_MAX_MS / 1000
+
+                # Start at full polling speed after (re)connecting
+                self._interval = self._min_interval
+                self._stable_ticks = 0
+                self._prev_sample = None
+
+                # Polls are scheduled relative to the previous deadline, so the
+                # time spent reading and sending doesn't add up as drift
+                loop = asyncio.get_running_loop()
+                next_deadline = loop.time()
+
                 while True:
-                    temps = await self.read_temperatures()
-                    if any(temp is not None for temp in temps.values()):
-                        message = json.dumps(
-                            {
-                                "temperatures": temps,
-                                "timestamp": asyncio.get_event_loop().time(),
-                            }
-                        )
-                        writer.write(f"{message}\n".encode())
+                    temps, has_valid = await self.read_temperatures()
+                    now = loop.time()
+                    if has_valid:
+                        if binary:
+                            frame = encoder.encode(
+                                self._seq,
+                                now,
+                                tuple(temps.get(gpu_id) for gpu_id in gpu_ids),
+                            )
+                        else:
+                            frame = encode_message(
+                                {"temperatures": temps, "timestamp": now}
+                            )
+                        self._seq += 1
+                        if not batched:
+                            batch_start = now
+                        pending.append(frame)
+                        batched += 1
+                    # Checked after failed reads as well, so queued samples
+                    # don't wait for the next valid reading
+                    if batched and (
+                        batched >= batch_size or now - batch_start >= batch_max
+                    ):
+                        writer.writelines(pending)
+                        pending = []
+                        batched = 0
                         await writer.drain()
 
-                    await asyncio.sleep(self.config.SLEEP_INTERVAL)
+                    interval = self._next_interval(temps, now)
+                    next_deadline += interval
+                    now = loop.time()
+                    if now > next_deadline + interval:
+                        logger.warning(
+                            "%sPolling fell %.2fs behind schedule, skipping missed polls",
+                            Fore.YELLOW,
+                            now - next_deadline,
+                        )
+                        next_deadline = now
+                    await asyncio.sleep(max(0.0, next_deadline - now))
 
             except asyncio.CancelledError:
                 logger.info("Shutting down...")
@@ -203,7 +382,7 @@ class TemperatureMonitor:
                         writer.close()
                         await writer.wait_closed()
                 else:
-                    logger.error(f"Error in monitor loop: {e}")
+                    logger.error("Error in monitor loop: %s", e)
 
                 if "writer" in locals():
                     try:
@@ -215,7 +394,7 @@ class TemperatureMonitor:
                 await asyncio.sleep(1)  # Brief pause before reconnect
 
 
-def parse_args():
+def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="GPU Temperature Monitor Client")
     parser.add_argument("--host", type=str, help="Fan control server host address")
     parser.add_argument("--port", type=int, help="Fan control server port")
@@ -227,17 +406,46 @@ def parse_args():
     parser.add_argument(
         "--interval", type=float, help="Temperature polling interval in seconds"
     )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        help="Polling interval in seconds while temperatures change (default: --interval)",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        help="Longest polling interval in seconds while temperatures are stable "
+        "(default: --min-interval, which disables adaptive polling)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Number of samples sent per network write (default: 1)",
+    )
+    parser.add_argument(
+        "--batch-max-ms",
+        type=int,
+        help="Longest time in ms a sample is held back for batching (default: 1000)",
+    )
+    parser.add_argument(
+        "--proto-version",
+        type=int,
+        choices=[1, 2],
+        help="Wire protocol, 1 for servers without binary frame support (default: 2)",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     return parser.parse_args()
 
 
-async def main():
+async def main() -> None:
+    configure_logging()
     args = parse_args()
 
     if args.debug:
         logger.setLevel(logging.DEBUG)
 
-    # Load config file with client defaults
+    # Write the default config file on first run, then load it
+    FanControlConfig.bootstrap_config("client")
     config = FanControlConfig.load_config("client")
 
     # Override with command line arguments if provided
@@ -247,19 +455,75 @@ async def main():
         config.PORT = args.port
     if args.interval:
         config.SLEEP_INTERVAL = args.interval
-
+    if args.min_interval:
+        config.MIN_INTERVAL = args.min_interval
+    if args.max_interval:
+        config.MAX_INTERVAL = args.max_interval
+    if args.batch_size is not None:
+        if args.batch_size < 1:
+            logger.error("Batch size must be at least 1")
+            return
+        config.BATCH_SIZE = args.batch_size
+    if args.batch_max_ms is not None:
+        if args.batch_max_ms < 0:
+            logger.error("Batch delay must not be negative")
+            return
+        config.BATCH_MAX_MS = args.batch_max_ms
+    if args.proto_version:
+        config.PROTO_VERSION = args.proto_version
+
+    min_interval = config.MIN_INTERVAL or config.SLEEP_INTERVAL
+    max_interval = config.MAX_INTERVAL or min_interval
+    if min_interval > max_interval:
+        logger.error("Minimum interval must not exceed maximum interval")
+        return
+    if max_interval >= CLIENT_TIMEOUT:
+        logger.error(
+            "Maximum interval must be below the server timeout of %ss", CLIENT_TIMEOUT
+        )
+        return
+    # A sample may wait up to the batch delay plus one polling interval
+    if (
+        config.BATCH_SIZE > 1
+        and config.BATCH_MAX_MS / 1000 + max_interval >= CLIENT_TIMEOUT
+    ):
+        logger.error(
+            "Batch delay plus maximum interval must be below the server timeout of %ss",
+            CLIENT_TIMEOUT,
+        )
+        return
+
+    monitor = None
     try:
-        logger.info(f"{Fore.GREEN}Starting temperature monitor...")
-        logger.info(f"{Fore.CYAN}Server: {config.HOST}:{config.PORT}")
-        logger.info(f"{Fore.CYAN}Update interval: {config.SLEEP_INTERVAL}s")
+        logger.info("%sStarting temperature monitor...", Fore.GREEN)
+        logger.info("%sServer: %s:%s", Fore.CYAN, config.HOST, config.PORT)
+        if max_interval > min_interval:
+            logger.info(
+                "%sUpdate interval: %ss - %ss (adaptive)",
+                Fore.CYAN,
+                min_interval,
+                max_interval,
+            )
+        else:
+            logger.info("%sUpdate interval: %ss", Fore.CYAN, min_interval)
+        if config.BATCH_SIZE > 1:
+            logger.info(
+                "%sBatching up to %s samples or %sms per write",
+                Fore.CYAN,
+                config.BATCH_SIZE,
+                config.BATCH_MAX_MS,
+            )
 
         monitor = TemperatureMonitor(config, args.gpu_paths)
         await monitor.monitor_loop()
     except KeyboardInterrupt:
-        logger.info(f"{Fore.YELLOW}Shutting down...")
+        logger.info("%sShutting down...", Fore.YELLOW)
     except Exception as e:
-        logger.error(f"{Fore.RED}Fatal error: {e}")
+        logger.error("%sFatal error: %s", Fore.RED, e)
         raise
+    finally:
+        if monitor is not None:
+            monitor.close()
 
 
 if __name__ == "__main__":
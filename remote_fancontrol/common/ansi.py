@@ -0,0 +1,30 @@
+"""ANSI color codes for console log output
+
+Colors are only emitted when stderr, where log records are written, is a
+terminal, so redirected output and the systemd journal stay plain text.
+"""
+
+import sys
+
+_ENABLED = sys.stderr is not None and sys.stderr.isatty()
+
+
+def _code(sequence: str) -> str:
+    return sequence if _ENABLED else ""
+
+
+class Fore:
+    """Foreground colors"""
+
+    RED = _code("\x1b[31m")
+    GREEN = _code("\x1b[32m")
+    YELLOW = _code("\x1b[33m")
+    BLUE = _code("\x1b[34m")
+    CYAN = _code("\x1b[36m")
+
+
+class Style:
+    """Text attributes"""
+
+    BRIGHT = _code("\x1b[1m")
+    RESET_ALL = _code("\x1b[0m")
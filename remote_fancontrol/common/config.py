@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import ClassVar, List, Dict, Optional, Tuple
 import json
 import os
 from pathlib import Path
@@ -23,30 +23,42 @@ class FanControlConfig:
     INITIAL_FAN_PERCENT: int
     # Default host for server
     HOST: str = "0.0.0.0"
+    # Minimum time between fan speed changes in ms, unless temperature jumps.
+    # Measured in sample arrival time at the server, so it only has an effect
+    # while samples arrive more often than this.
+    DEBOUNCE_MS: int = 500
+    # Adaptive polling bounds in seconds (client), both default to SLEEP_INTERVAL
+    MIN_INTERVAL: Optional[float] = None
+    MAX_INTERVAL: Optional[float] = None
+    # Samples sent per network write and longest time in ms a sample is held
+    # back before sending (client), a batch size of 1 sends every sample
+    BATCH_SIZE: int = 1
+    BATCH_MAX_MS: int = 1000
+    # Wire protocol sent by the client, 2 for binary frames or 1 for the JSON
+    # lines understood by older servers
+    PROTO_VERSION: int = 2
     # Fan configuration mapping
     fans: Dict[str, Dict[str, str]] = field(default_factory=dict)
     # GPU temperature sensor mapping (client)
     gpus: Dict[str, Dict[str, str]] = field(default_factory=dict)
 
-    @classmethod
-    def load_config(cls, config_type: str = "server") -> "FanControlConfig":
-        """Load configuration from JSON file
-
-        Args:
-            config_type: Either "server" or "client"
+    # Config file contents keyed by path, with the mtime and size they were
+    # read at
+    _file_cache: ClassVar[Dict[Path, Tuple[int, int, str]]] = {}
 
-        Returns:
-            FanControlConfig instance
-        """
-        # Search paths in order
+    @staticmethod
+    def _search_paths(config_type: str) -> List[Path]:
+        """Get the config file locations for config_type in search order"""
         config_name = f"fancontrol-{config_type}.json"
-        search_paths = [
+        return [
             Path(f"/etc/remote-fancontrol/{config_name}"),  # System-wide
             Path.home() / ".config/remote-fancontrol" / config_name,  # User config
             Path.cwd() / config_name,  # Project directory
         ]
 
-        # Default configs
+    @staticmethod
+    def _defaults(config_type: str) -> Dict:
+        """Get the default config data for config_type"""
         defaults = {
             "server": {
                 "temps": [35000, 55000, 80000, 90000],
@@ -57,6 +69,7 @@ class FanControlConfig:
                 "host": "0.0.0.0",
                 "failsafe_fan_percent": 80,
                 "initial_fan_percent": 0,
+                "debounce_ms": 500,
                 "fans": {},
                 "gpus": {},
             },
@@ -69,42 +82,86 @@ class FanControlConfig:
                 "hysteresis": 0,
                 "failsafe_fan_percent": 0,
                 "initial_fan_percent": 0,
+                "debounce_ms": 0,
+                "batch_size": 1,
+                "batch_max_ms": 1000,
+                "proto_version": 2,
                 "fans": {},
                 "gpus": {},
             },
         }
+        return defaults[config_type]
+
+    @classmethod
+    def bootstrap_config(cls, config_type: str = "server") -> None:
+        """Write the default config file on first run
+
+        Does nothing if a config file already exists in any search path.
+
+        Args:
+            config_type: Either "server" or "client"
+        """
+        search_paths = cls._search_paths(config_type)
+        if any(p.exists() for p in search_paths):
+            return
+
+        defaults = cls._defaults(config_type)
+        try:
+            # Prefer the system-wide path
+            default_path = search_paths[0]
+            os.makedirs(default_path.parent, exist_ok=True)
+            with open(default_path, "w") as f:
+                json.dump(defaults, f, indent=4)
+        except PermissionError:
+            # Try user config if system-wide fails
+            default_path = search_paths[1]
+            os.makedirs(default_path.parent, exist_ok=True)
+            with open(default_path, "w") as f:
+                json.dump(defaults, f, indent=4)
+
+    @classmethod
+    def load_config(cls, config_type: str = "server") -> "FanControlConfig":
+        """Load configuration from JSON file
+
+        Only reads, see bootstrap_config() for creating the default file.
+
+        Args:
+            config_type: Either "server" or "client"
+
+        Returns:
+            FanControlConfig instance
+        """
+        search_paths = cls._search_paths(config_type)
+        defaults = {config_type: cls._defaults(config_type)}
 
         # Find and load config file
         config_data = None
         for path in search_paths:
-            if path.exists():
-                try:
-                    with open(path) as f:
-                        config_data = json.load(f)
-                    break
-                except json.JSONDecodeError as e:
-                    print(f"Error reading config from {path}: {e}")
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+
+            # Only read again if the file changed since it was last loaded.
+            # The text is parsed on every load, which is cheaper than
+            # copying a parsed dict and keeps each config independent.
+            cached = cls._file_cache.get(path)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                text = cached[2]
+            else:
+                with open(path) as f:
+                    text = f.read()
+            try:
+                config_data = json.loads(text)
+                cls._file_cache[path] = (st.st_mtime_ns, st.st_size, text)
+                break
+            except json.JSONDecodeError as e:
+                print(f"Error reading config from {path}: {e}")
 
         # Use defaults if no config file found
         if config_data is None:
             config_data = defaults[config_type]
 
-        # Create config directories if they don't exist
-        os.makedirs("/etc/remote-fancontrol", exist_ok=True)
-        os.makedirs(Path.home() / ".config/remote-fancontrol", exist_ok=True)
-
-        # Save default config if none exists
-        if not any(p.exists() for p in search_paths):
-            default_path = search_paths[0]  # Use system-wide path
-            try:
-                with open(default_path, "w") as f:
-                    json.dump(defaults[config_type], f, indent=4)
-            except PermissionError:
-                # Try user config if system-wide fails
-                default_path = search_paths[1]
-                with open(default_path, "w") as f:
-                    json.dump(defaults[config_type], f, indent=4)
-
         # Add fans to config data if present in file but not in defaults
         if config_data.get("fans") and "fans" not in defaults[config_type]:
             defaults[config_type]["fans"] = {}
@@ -126,14 +183,46 @@ class FanControlConfig:
             INITIAL_FAN_PERCENT=config_data.get(
                 "initial_fan_percent", defaults[config_type]["initial_fan_percent"]
             ),
+            DEBOUNCE_MS=config_data.get(
+                "debounce_ms", defaults[config_type]["debounce_ms"]
+            ),
+            MIN_INTERVAL=config_data.get(
+                "min_interval", defaults[config_type].get("min_interval")
+            ),
+            MAX_INTERVAL=config_data.get(
+                "max_interval", defaults[config_type].get("max_interval")
+            ),
+            BATCH_SIZE=config_data.get(
+                "batch_size", defaults[config_type].get("batch_size", 1)
+            ),
+            BATCH_MAX_MS=config_data.get(
+                "batch_max_ms", defaults[config_type].get("batch_max_ms", 1000)
+            ),
+            PROTO_VERSION=config_data.get(
+                "proto_version", defaults[config_type].get("proto_version", 2)
+            ),
             fans=config_data.get("fans", defaults[config_type].get("fans", {})),
             gpus=config_data.get("gpus", defaults[config_type].get("gpus", {})),
         )
 
-    def __post_init__(self):
+    def __post_init__(self) -> None:
         if len(self.TEMPS) != len(self.PWMS):
             raise ValueError("Temperature and PWM arrays must have the same length")
         if not 0 <= self.FAILSAFE_FAN_PERCENT <= 100:
             raise ValueError("Failsafe fan percentage must be between 0 and 100")
         if not 0 <= self.INITIAL_FAN_PERCENT <= 100:
             raise ValueError("Initial fan percentage must be between 0 and 100")
+        if self.DEBOUNCE_MS < 0:
+            raise ValueError("Debounce interval must not be negative")
+        if (
+            self.MIN_INTERVAL is not None
+            and self.MAX_INTERVAL is not None
+            and self.MIN_INTERVAL > self.MAX_INTERVAL
+        ):
+            raise ValueError("Minimum interval must not exceed maximum interval")
+        if self.BATCH_SIZE < 1:
+            raise ValueError("Batch size must be at least 1")
+        if self.BATCH_MAX_MS < 0:
+            raise ValueError("Batch delay must not be negative")
+        if self.PROTO_VERSION not in (1, 2):
+            raise ValueError("Protocol version must be 1 or 2")
@@ -0,0 +1,35 @@
+"""Helpers for enumerating hwmon devices in sysfs"""
+
+import os
+from typing import Iterator, Set, Tuple
+
+# Directory containing one hwmon* entry per hardware monitoring device
+HWMON_ROOT = "/sys/class/hwmon"
+
+
+def scan_hwmon(root: str = HWMON_ROOT) -> Iterator[Tuple[str, Set[str]]]:
+    """Enumerate hwmon devices and the attribute files they expose
+
+    Each device directory is listed exactly once with os.scandir, so callers
+    can match attribute names in memory instead of globbing and stat()ing
+    candidate paths.
+
+    Args:
+        root: hwmon class directory to scan
+
+    Yields:
+        (device path, set of attribute file names) for every hwmon device
+    """
+    try:
+        with os.scandir(root) as devices:
+            hwmons = [entry.path for entry in devices if entry.name.startswith("hwmon")]
+    except OSError:
+        return
+
+    for path in hwmons:
+        try:
+            with os.scandir(path) as attributes:
+                names = {entry.name for entry in attributes}
+        except OSError:
+            continue
+        yield path, names
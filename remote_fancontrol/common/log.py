@@ -0,0 +1,85 @@
+"""Colored console logging shared by the client and server"""
+
+import logging
+from typing import List, Optional
+
+from .ansi import Fore, Style
+
+# Message color per level, the rest of the log format is the same for all
+_LEVEL_COLORS = {
+    logging.DEBUG: Fore.CYAN,
+    logging.INFO: Fore.GREEN,
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED + Style.BRIGHT,
+}
+_FORMAT_TEMPLATE = (
+    f"{Style.RESET_ALL}[{Fore.YELLOW}%(asctime)s{Style.RESET_ALL}]: "
+    f"{{color}}%(levelname)s: %(message)s{Style.RESET_ALL}"
+)
+
+
+class ColoredFormatter(logging.Formatter):
+    FORMATS = {
+        level: _FORMAT_TEMPLATE.format(color=color)
+        for level, color in _LEVEL_COLORS.items()
+    }
+    # One formatter per level, built once instead of for every record
+    _FORMATTERS = {
+        level: logging.Formatter(log_fmt, datefmt="%Y-%m-%d %H:%M:%S")
+        for level, log_fmt in FORMATS.items()
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        formatter = self._FORMATTERS.get(record.levelno)
+        if formatter is None:
+            return super().format(record)
+        return formatter.format(record)
+
+
+# Shared colored console handler, created by configure_logging()
+_handler: Optional[logging.Handler] = None
+# Loggers handed out by get_colored_logger()
+_loggers: List[logging.Logger] = []
+
+
+def configure_logging() -> None:
+    """Set up colored console output for all colored loggers
+
+    Called from the entry points rather than at import time, so importing
+    the client or server modules leaves the logging configuration alone.
+    Only the first call has an effect.
+    """
+    global _handler
+    if _handler is not None:
+        return
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",  # Simple format since we handle formatting in ColoredFormatter
+        handlers=[logging.NullHandler()],  # Prevent double logging
+    )
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(ColoredFormatter())
+    for logger in _loggers:
+        logger.addHandler(_handler)
+
+
+def get_colored_logger(name: str) -> logging.Logger:
+    """Get a logger writing to the shared colored console handler
+
+    The handler is attached once configure_logging() has been called.
+
+    Args:
+        name: Logger name, usually the module's __name__
+
+    Returns:
+        Logger at INFO level
+    """
+    logger = logging.getLogger(name)
+    if logger not in _loggers:
+        _loggers.append(logger)
+        if _handler is not None:
+            logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    return logger
@@ -0,0 +1,211 @@
+"""Wire format shared by the remote fan control client and server
+
+A connection starts with a JSON line handshake listing the GPU IDs the
+client reports, e.g. {"gpu_ids": ["gpu0", "gpu1"]}. After that, every
+temperature sample is a binary frame: a little-endian uint16 payload
+length followed by the payload
+
+    uint32 sequence number, float64 timestamp, int32 temperature (mK) per GPU
+
+with temperatures in handshake order and TEMP_MISSING for failed reads.
+
+Clients that skip the handshake may keep sending legacy JSON lines of the
+form {"temperatures": {...}, "timestamp": ...}.
+"""
+
+import asyncio
+import json
+import struct
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    # Optional C accelerated JSON codec, see the "fast" extra
+    import orjson
+except ImportError:
+    _HAVE_ORJSON = False
+else:
+    _HAVE_ORJSON = True
+
+
+# Sentinel for a temperature that could not be read
+TEMP_MISSING = -(2**31)
+
+# Seconds without a sample after which the server applies failsafe speeds
+CLIENT_TIMEOUT = 5.0
+
+# Length prefix of a binary frame
+FRAME_LENGTH = struct.Struct("<H")
+# Sequence number and timestamp at the start of a frame payload
+_FRAME_HEAD = struct.Struct("<Id")
+
+
+class DecodeError(ValueError):
+    """Raised for malformed messages"""
+
+
+def encode_message(message: Any) -> bytes:
+    """Serialize a message as a newline terminated JSON line
+
+    Args:
+        message: JSON serializable message
+
+    Returns:
+        Encoded message including the trailing newline
+    """
+    if _HAVE_ORJSON:
+        return orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(message).encode() + b"\n"
+
+
+def decode_message(data: bytes) -> Any:
+    """Parse a JSON line received from the peer
+
+    Args:
+        data: Raw message, with or without the trailing newline
+
+    Returns:
+        Decoded message
+
+    Raises:
+        DecodeError: If the data is not valid JSON
+    """
+    try:
+        if _HAVE_ORJSON:
+            return orjson.loads(data)
+        return json.loads(data)
+    except ValueError as e:
+        raise DecodeError(str(e)) from e
+
+
+def encode_hello(gpu_ids: Sequence[str]) -> bytes:
+    """Build the handshake announcing the GPU order of binary frames"""
+    return encode_message({"gpu_ids": list(gpu_ids)})
+
+
+def parse_hello(message: Dict[str, Any]) -> List[str]:
+    """Validate a decoded handshake message
+
+    Args:
+        message: Decoded JSON handshake
+
+    Returns:
+        GPU IDs in frame order
+
+    Raises:
+        DecodeError: If the handshake is malformed
+    """
+    gpu_ids = message.get("gpu_ids")
+    if not isinstance(gpu_ids, list) or not all(isinstance(g, str) for g in gpu_ids):
+        raise DecodeError("gpu_ids must be a list of strings")
+    return gpu_ids
+
+
+def parse_legacy(message: Any) -> Dict[str, Optional[int]]:
+    """Validate a decoded legacy JSON line
+
+    Args:
+        message: Decoded JSON line of the form {"temperatures": {...}, ...}
+
+    Returns:
+        Dict mapping GPU IDs to temperatures in mK, None if unavailable
+
+    Raises:
+        DecodeError: If the message is malformed
+    """
+    if not isinstance(message, dict):
+        raise DecodeError("Message must be a JSON object")
+    temps = message.get("temperatures")
+    if not isinstance(temps, dict):
+        raise DecodeError("temperatures must be an object")
+    for gpu_id, temp in temps.items():
+        if temp is not None and (not isinstance(temp, int) or isinstance(temp, bool)):
+            raise DecodeError(f"Invalid temperature for {gpu_id}: {temp!r}")
+    return temps
+
+
+@lru_cache(maxsize=8)
+def frame_struct(count: int) -> struct.Struct:
+    """Get the payload layout for a frame carrying count temperatures"""
+    return struct.Struct(f"<Id{count}i")
+
+
+class FrameEncoder:
+    """Packs temperature samples into binary frames for a fixed GPU order
+
+    Temperatures usually repeat between samples at idle, so the packed
+    temperature block of the previous sample is reused when they didn't
+    change and only the sequence number and timestamp are packed.
+    """
+
+    def __init__(self, count: int):
+        """
+        Args:
+            count: Number of temperatures per frame, as announced in the handshake
+        """
+        self._temps_layout = struct.Struct(f"<{count}i")
+        self._prefix = FRAME_LENGTH.pack(frame_struct(count).size)
+        self._last_temps: Optional[Tuple[Optional[int], ...]] = None
+        self._last_packed = b""
+
+    def encode(
+        self, seq: int, timestamp: float, temps: Tuple[Optional[int], ...]
+    ) -> bytes:
+        """Pack a temperature sample into a length prefixed binary frame
+
+        Args:
+            seq: Sample sequence number, wraps at 32 bits
+            timestamp: Sample time in seconds
+            temps: Temperatures in mK in handshake order, None if unavailable
+
+        Returns:
+            Encoded frame
+        """
+        if temps != self._last_temps:
+            self._last_packed = self._temps_layout.pack(
+                *(TEMP_MISSING if t is None else t for t in temps)
+            )
+            self._last_temps = temps
+        return (
+            self._prefix
+            + _FRAME_HEAD.pack(seq & 0xFFFFFFFF, timestamp)
+            + self._last_packed
+        )
+
+
+def decode_frame(payload: bytes, gpu_ids: Sequence[str]) -> Dict[str, Optional[int]]:
+    """Unpack the temperatures of a binary frame payload
+
+    Args:
+        payload: Frame payload without the length prefix
+        gpu_ids: GPU IDs announced in the handshake
+
+    Returns:
+        Dict mapping GPU IDs to temperatures in mK, None if unavailable
+
+    Raises:
+        DecodeError: If the payload size doesn't match the handshake
+    """
+    layout = frame_struct(len(gpu_ids))
+    if len(payload) != layout.size:
+        raise DecodeError(
+            f"Frame of {len(payload)} bytes, expected {layout.size} for {len(gpu_ids)} GPUs"
+        )
+    _, _, *temps = layout.unpack(payload)
+    return {
+        gpu_id: None if t == TEMP_MISSING else t for gpu_id, t in zip(gpu_ids, temps)
+    }
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """Read the payload of the next binary frame
+
+    Returns:
+        Frame payload, or b"" if the peer closed the connection
+    """
+    try:
+        header = await reader.readexactly(FRAME_LENGTH.size)
+        (length,) = FRAME_LENGTH.unpack(header)
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return b""
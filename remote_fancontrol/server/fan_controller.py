@@ -1,85 +1,68 @@
 import asyncio
-import json
+import bisect
 import logging
 import argparse
+import os
+import signal
 from pathlib import Path
-from typing import Optional, Dict, Tuple
-import glob
-from datetime import datetime
-from colorama import Fore, Style, init
+from typing import Optional, Dict, List, Tuple, TypedDict, cast
 import re
+from functools import lru_cache
 
+from ..common.ansi import Fore
 from ..common.config import FanControlConfig
-
-init(autoreset=True)  # Initialize colorama
-
-
-class ColoredFormatter(logging.Formatter):
-    FORMATS = {
-        logging.DEBUG: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.CYAN
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.INFO: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.GREEN
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.WARNING: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.YELLOW
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.ERROR: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.RED
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-        logging.CRITICAL: Style.RESET_ALL
-        + "["
-        + Fore.YELLOW
-        + "%(asctime)s"
-        + Style.RESET_ALL
-        + "]: "
-        + Fore.RED
-        + Style.BRIGHT
-        + "%(levelname)s: %(message)s"
-        + Style.RESET_ALL,
-    }
-
-    def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt, datefmt="%Y-%m-%d %H:%M:%S")
-        return formatter.format(record)
-
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",  # Simple format since we handle formatting in ColoredFormatter
-    handlers=[logging.NullHandler()],  # Prevent double logging
+from ..common.hwmon import scan_hwmon
+from ..common.log import configure_logging, get_colored_logger
+from ..common.protocol import (
+    CLIENT_TIMEOUT,
+    DecodeError,
+    decode_frame,
+    decode_message,
+    parse_hello,
+    parse_legacy,
+    read_frame,
 )
-logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-handler.setFormatter(ColoredFormatter())
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
+
+logger = get_colored_logger(__name__)
+
+# Encoded sysfs values for every possible PWM setting
+_PWM_BYTES: Tuple[bytes, ...] = tuple(b"%d" % i for i in range(256))
+
+
+class _FanPaths(TypedDict):
+    pwm: Path
+    mode: Path
+    reference_gpu: str
+
+
+class FanInfo(_FanPaths, total=False):
+    """Control files of a fan and the GPU whose temperature drives it"""
+
+    # Persistent descriptors of the pwm and mode files, -1 once closed
+    pwm_fd: int
+    mode_fd: int
+
+
+@lru_cache(maxsize=512)
+def _interpolate(temp: int, temps: Tuple[int, ...], pwms: Tuple[int, ...]) -> int:
+    """Piecewise linear lookup of a PWM value on a fan curve
+
+    Args:
+        temp: Temperature in mK
+        temps: Curve temperature thresholds in mK, ascending
+        pwms: PWM values corresponding to the thresholds
+
+    Returns:
+        Interpolated PWM value
+    """
+    i = bisect.bisect_left(temps, temp)
+    if i == 0:
+        return pwms[0]
+    if i == len(temps):
+        return pwms[-1]
+    return pwms[i - 1] + (temp - temps[i - 1]) * (pwms[i] - pwms[i - 1]) // (
+        temps[i] - temps[i - 1]
+    )
 
 
 class FanController:
@@ -94,9 +77,30 @@ class FanController:
             fan_configs: Dict mapping GPU IDs to (pwm_path, mode_path) tuples
         """
         self.config = config
+        # hwmon device names by path, read on first lookup
+        self._hwmon_names: Optional[Dict[str, str]] = None
         self.fans = self._setup_fans(fan_configs)
-        self.last_temps = {}
-        self.temp_at_last_change = {}
+        # GPUs whose temperature drives at least one fan
+        self._reference_gpus = list(
+            dict.fromkeys(fan["reference_gpu"] for fan in self.fans.values())
+        )
+        # (fan ID, reference GPU, PWM descriptor) of every fan, walked on each
+        # sample instead of the per-fan dicts
+        self._fan_tuples: List[Tuple[str, str, int]] = [
+            (fan_id, fan["reference_gpu"], fan["pwm_fd"])
+            for fan_id, fan in self.fans.items()
+        ]
+        self.last_temps: Dict[str, int] = {}
+        self.temp_at_last_change: Dict[str, int] = {}
+        # Last PWM value written to each fan, missing when unknown
+        self._last_pwm: Dict[str, int] = {}
+        # Debounce state per reference GPU: time of the last speed change and
+        # highest temperature seen within the debounce window after it
+        self._last_write_ts: Dict[str, float] = {}
+        self._recent_max: Dict[str, int] = {}
+
+        self._load_fan_curve()
+        self._load_fan_speeds()
 
         # Set initial fan speeds
         for gpu_id in self.fans:
@@ -105,13 +109,13 @@ class FanController:
 
     def _setup_fans(
         self, fan_configs: Optional[Dict[str, Tuple[str, str]]] = None
-    ) -> Dict[str, Dict[str, Path]]:
+    ) -> Dict[str, FanInfo]:
         """Setup fan control paths for each GPU
 
         Returns:
             Dict mapping GPU IDs to their control paths
         """
-        fans = {}
+        fans: Dict[str, FanInfo] = {}
 
         # First try config file
         config_fans = getattr(self.config, "fans", None)
@@ -134,16 +138,22 @@ class FanController:
                                 "reference_gpu": ref_gpu,
                             }
                             logger.info(
-                                f"Configured fan {fan_id} using hwmon {paths['hwmon_name']}"
+                                "Configured fan %s using hwmon %s",
+                                fan_id,
+                                paths["hwmon_name"],
                             )
                             fan_configured = True
                         else:
                             logger.error(
-                                f"Invalid paths for fan {fan_id} in hwmon {hwmon_path}: {pwm}, {mode}"
+                                "Invalid paths for fan %s in hwmon %s: %s, %s",
+                                fan_id,
+                                hwmon_path,
+                                pwm,
+                                mode,
                             )
                     else:
                         logger.error(
-                            f"No hwmon device found matching: {paths['hwmon_name']}"
+                            "No hwmon device found matching: %s", paths["hwmon_name"]
                         )
 
                 # Fall back to direct paths if specified and hwmon config failed
@@ -156,14 +166,18 @@ class FanController:
                             "mode": mode,
                             "reference_gpu": ref_gpu,
                         }
-                        logger.info(f"Configured fan {fan_id} using direct paths")
+                        logger.info("Configured fan %s using direct paths", fan_id)
                     else:
                         logger.error(
-                            f"Invalid paths for fan {fan_id}: {paths['pwm_path']}, {paths['mode_path']}"
+                            "Invalid paths for fan %s: %s, %s",
+                            fan_id,
+                            paths["pwm_path"],
+                            paths["mode_path"],
                         )
                 elif not fan_configured:
                     logger.error(
-                        f"Fan {fan_id} configuration must specify either hwmon_name or pwm_path/mode_path"
+                        "Fan %s configuration must specify either hwmon_name or pwm_path/mode_path",
+                        fan_id,
                     )
 
         # Then try command line arguments if no fans configured yet
@@ -173,31 +187,48 @@ class FanController:
                 mode = Path(mode_path)
                 if pwm.exists() and mode.exists():
                     fans[gpu_id] = {"pwm": pwm, "mode": mode, "reference_gpu": gpu_id}
-                    logger.info(f"Configured fan {gpu_id} using command line paths")
+                    logger.info("Configured fan %s using command line paths", gpu_id)
                 else:
                     logger.error(
-                        f"Invalid paths for GPU {gpu_id}: {pwm_path}, {mode_path}"
+                        "Invalid paths for GPU %s: %s, %s", gpu_id, pwm_path, mode_path
                     )
 
         # Auto-detect only if no fans configured
         if not fans:
-            pattern = "/sys/class/hwmon/hwmon*/pwm?"
             gpu_count = 0
-            for pwm_path in glob.glob(pattern):
-                pwm = Path(pwm_path)
-                mode = pwm.parent / f"{pwm.name}_enable"
-                if mode.exists():
+            for device_path, names in scan_hwmon():
+                # pwmN attributes that have a matching pwmN_enable mode file
+                for name in sorted(names):
+                    if len(name) != 4 or not name.startswith("pwm"):
+                        continue
+                    if f"{name}_enable" not in names:
+                        continue
+                    pwm = Path(device_path, name)
+                    mode = Path(device_path, f"{name}_enable")
                     gpu_id = f"gpu{gpu_count}"
                     fans[gpu_id] = {"pwm": pwm, "mode": mode, "reference_gpu": gpu_id}
                     gpu_count += 1
-                    logger.info(f"Auto-detected fan {gpu_id}")
+                    logger.info("Auto-detected fan %s", gpu_id)
             if gpu_count > 0:
                 logger.info("Using auto-detected fan configuration")
 
+        # Keep the sysfs attributes open so updates don't reopen them every tick
+        for fan_id in list(fans):
+            try:
+                fans[fan_id]["pwm_fd"] = os.open(str(fans[fan_id]["pwm"]), os.O_WRONLY)
+                fans[fan_id]["mode_fd"] = os.open(
+                    str(fans[fan_id]["mode"]), os.O_WRONLY
+                )
+            except OSError as e:
+                logger.error("Failed to open fan control files for %s: %s", fan_id, e)
+                if "pwm_fd" in fans[fan_id]:
+                    os.close(fans[fan_id]["pwm_fd"])
+                del fans[fan_id]
+
         if not fans:
             raise ValueError("No valid fan control paths found")
 
-        logger.info(f"Configured fans: {list(fans.keys())}")
+        logger.info("Configured fans: %s", list(fans.keys()))
         return fans
 
     @staticmethod
@@ -215,7 +246,7 @@ class FanController:
                     return name
             return None
         except (IOError, OSError) as e:
-            logger.debug(f"Error reading GPU name: {e}")
+            logger.debug("Error reading GPU name: %s", e)
             return None
 
     def _find_hwmon_by_name(self, pattern: str) -> Optional[Path]:
@@ -230,203 +261,395 @@ class FanController:
         # Convert pattern to regex if it's not already
         if not pattern.startswith("^") and not pattern.endswith("$"):
             pattern = f".*{pattern}.*"
+        regex = re.compile(pattern, re.IGNORECASE)
 
         try:
-            for hwmon in Path("/sys/class/hwmon").glob("hwmon*"):
-                name_file = hwmon / "name"
-                if name_file.exists():
-                    name = name_file.read_text().strip()
-                    if re.match(pattern, name, re.IGNORECASE):
-                        logger.debug(f"Found matching hwmon device: {name} at {hwmon}")
-                        return hwmon
-            logger.debug(f"No hwmon device found matching pattern: {pattern}")
+            # Names don't change while the system is up, so read them only once
+            # even when several fans are configured
+            if self._hwmon_names is None:
+                hwmon_names = {}
+                for hwmon_path, names in scan_hwmon():
+                    if "name" in names:
+                        name_file = Path(hwmon_path, "name")
+                        hwmon_names[hwmon_path] = name_file.read_text().strip()
+                self._hwmon_names = hwmon_names
+
+            for hwmon_path, name in self._hwmon_names.items():
+                if regex.match(name):
+                    logger.debug(
+                        "Found matching hwmon device: %s at %s", name, hwmon_path
+                    )
+                    return Path(hwmon_path)
+            logger.debug("No hwmon device found matching pattern: %s", pattern)
             return None
         except (IOError, OSError) as e:
-            logger.error(f"Error searching for hwmon device: {e}")
+            logger.error("Error searching for hwmon device: %s", e)
             return None
 
-    def set_fan_mode(self, gpu_id: str, mode: int):
+    def _write_fan_file(self, gpu_id: str, name: str, data: bytes) -> None:
+        """Rewrite a fan's sysfs attribute through its persistent descriptor
+
+        Args:
+            gpu_id: Fan identifier
+            name: Either "pwm" or "mode"
+            data: Encoded value to write
+        """
+        fan = self.fans[gpu_id]
+        os.pwrite(fan["pwm_fd"] if name == "pwm" else fan["mode_fd"], data, 0)
+
+    def _encode_pwm(self, pwm: int) -> bytes:
+        """Get the sysfs representation of a PWM value"""
+        if 0 <= pwm <= 255:
+            return _PWM_BYTES[pwm]
+        return b"%d" % pwm
+
+    def set_fan_mode(self, gpu_id: str, mode: int) -> None:
         """Set fan control mode for specified GPU"""
         if gpu_id not in self.fans:
-            logger.error(f"Unknown GPU: {gpu_id}")
+            logger.error("Unknown GPU: %s", gpu_id)
             return
 
         try:
-            self.fans[gpu_id]["mode"].write_text(str(mode))
-            logger.debug(f"Set fan mode to {mode} for GPU {gpu_id}")
+            # The driver may change the PWM value while not in manual mode
+            self._last_pwm.pop(gpu_id, None)
+            self._write_fan_file(gpu_id, "mode", b"%d" % mode)
+            logger.debug("Set fan mode to %d for GPU %s", mode, gpu_id)
         except IOError as e:
-            logger.error(f"Failed to set fan mode for GPU {gpu_id}: {e}")
+            logger.error("Failed to set fan mode for GPU %s: %s", gpu_id, e)
 
-    def set_pwm(self, gpu_id: str, pwm: int):
+    def set_pwm(self, gpu_id: str, pwm: int) -> None:
         """Set PWM value for specified GPU"""
         if gpu_id not in self.fans:
-            logger.error(f"Unknown GPU: {gpu_id}")
+            logger.error("Unknown GPU: %s", gpu_id)
             return
 
-        try:
-            self.fans[gpu_id]["pwm"].write_text(str(pwm))
-            logger.debug(f"Set PWM to {pwm} for GPU {gpu_id}")
-        except IOError as e:
-            logger.error(f"Failed to set PWM for GPU {gpu_id}: {e}")
+        self._write_pwms([(gpu_id, pwm, self.fans[gpu_id]["pwm_fd"])])
+
+    def _write_pwms(self, updates: List[Tuple[str, int, int]]) -> None:
+        """Set PWM values for several fans in one pass
+
+        Unchanged values are filtered out and the rest encoded before any
+        write is issued, so the writes go out back to back.
+
+        Args:
+            updates: (fan ID, PWM value, PWM descriptor) per fan
+        """
+        last_pwm = self._last_pwm
+        writes = []
+        for gpu_id, pwm, fd in updates:
+            if last_pwm.get(gpu_id) == pwm:
+                continue
+            writes.append((gpu_id, pwm, fd, self._encode_pwm(pwm)))
+
+        for gpu_id, pwm, fd, data in writes:
+            try:
+                os.pwrite(fd, data, 0)
+                last_pwm[gpu_id] = pwm
+            except IOError as e:
+                logger.error("Failed to set PWM for GPU %s: %s", gpu_id, e)
+
+        if writes and logger.isEnabledFor(logging.DEBUG):
+            for gpu_id, pwm, _, _ in writes:
+                logger.debug("Set PWM to %d for GPU %s", pwm, gpu_id)
+
+    def _load_fan_curve(self) -> None:
+        """Snapshot the fan curve from config as hashable tuples
+
+        Must be called again if config.TEMPS or config.PWMS are changed
+        after construction.
+        """
+        self._temps = tuple(self.config.TEMPS)
+        self._pwms = tuple(self.config.PWMS)
+
+    def _load_fan_speeds(self) -> None:
+        """Precompute the encoded failsafe and initial PWM values
+
+        Must be called again if config.FAILSAFE_FAN_PERCENT or
+        config.INITIAL_FAN_PERCENT are changed after construction.
+        """
+        # Convert percentage to PWM value (0-255)
+        self._failsafe_pwm = int(self.config.FAILSAFE_FAN_PERCENT * 255 / 100)
+        self._failsafe_pwm_bytes = self._encode_pwm(self._failsafe_pwm)
+        self._initial_pwm = int(self.config.INITIAL_FAN_PERCENT * 255 / 100)
+        self._initial_pwm_bytes = self._encode_pwm(self._initial_pwm)
 
     def interpolate_pwm(self, temp: int) -> int:
         """Calculate PWM value based on temperature"""
-        logger.debug(f"Interpolating PWM for temperature {temp/1000:.1f}°C")
+        return _interpolate(temp, self._temps, self._pwms)
 
-        if temp <= self.config.TEMPS[0]:
-            logger.debug(
-                f"Temperature below minimum, using minimum PWM: {self.config.PWMS[0]}"
-            )
-            return self.config.PWMS[0]
-        elif temp >= self.config.TEMPS[-1]:
-            logger.debug(
-                f"Temperature above maximum, using maximum PWM: {self.config.PWMS[-1]}"
-            )
-            return self.config.PWMS[-1]
+    def interpolate_pwms(self, temps: Dict[str, int]) -> Dict[str, int]:
+        """Calculate PWM values for several temperatures in one call
 
-        for i in range(1, len(self.config.TEMPS)):
-            if temp <= self.config.TEMPS[i]:
-                temp_range = self.config.TEMPS[i] - self.config.TEMPS[i - 1]
-                pwm_range = self.config.PWMS[i] - self.config.PWMS[i - 1]
-                temp_delta = temp - self.config.TEMPS[i - 1]
+        Args:
+            temps: Dict mapping GPU IDs to temperatures in mK
 
-                pwm = self.config.PWMS[i - 1] + (temp_delta * pwm_range // temp_range)
-                logger.debug(
-                    f"Interpolated between {self.config.TEMPS[i-1]/1000:.1f}°C "
-                    f"and {self.config.TEMPS[i]/1000:.1f}°C: {pwm}"
-                )
-                return pwm
+        Returns:
+            Dict mapping the same GPU IDs to PWM values
+        """
+        curve_temps = self._temps
+        curve_pwms = self._pwms
+        return {
+            gpu_id: _interpolate(temp, curve_temps, curve_pwms)
+            for gpu_id, temp in temps.items()
+        }
 
-        return self.config.PWMS[-1]
+    def set_failsafe_speed(self, gpu_id: str) -> bool:
+        """Set failsafe fan speed for specified GPU
 
-    def set_failsafe_speed(self, gpu_id: str):
-        """Set failsafe fan speed for specified GPU"""
+        Returns:
+            True if the failsafe speed was written
+        """
         if gpu_id not in self.fans:
-            logger.error(f"Unknown GPU: {gpu_id}")
-            return
+            logger.error("Unknown GPU: %s", gpu_id)
+            return False
 
         try:
-            # Convert percentage to PWM value (0-255)
-            pwm = int(self.config.FAILSAFE_FAN_PERCENT * 255 / 100)
-            self.fans[gpu_id]["pwm"].write_text(str(pwm))
+            self._write_fan_file(gpu_id, "pwm", self._failsafe_pwm_bytes)
+            self._last_pwm[gpu_id] = self._failsafe_pwm
             logger.warning(
-                f"{Fore.YELLOW}[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] "
-                f"{gpu_id}: Set to failsafe speed: {self.config.FAILSAFE_FAN_PERCENT}%"
+                "%s%s: Set to failsafe speed: %s%%",
+                Fore.YELLOW,
+                gpu_id,
+                self.config.FAILSAFE_FAN_PERCENT,
             )
+            return True
         except IOError as e:
-            logger.error(f"Failed to set failsafe speed for GPU {gpu_id}: {e}")
+            logger.error("Failed to set failsafe speed for GPU %s: %s", gpu_id, e)
+            return False
+
+    async def set_failsafe_speeds(self) -> bool:
+        """Set failsafe fan speed for all GPUs concurrently
 
-    def set_initial_speed(self, gpu_id: str):
+        The sysfs writes are handed to the default executor so that fans
+        on different devices are written in parallel instead of one after
+        another.
+
+        Returns:
+            True if the failsafe speed was written to every fan
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(None, self.set_failsafe_speed, gpu_id)
+                for gpu_id in self.fans
+            )
+        )
+        return all(results)
+
+    def set_initial_speed(self, gpu_id: str) -> None:
         """Set initial fan speed for specified GPU"""
         if gpu_id not in self.fans:
-            logger.error(f"Unknown GPU: {gpu_id}")
+            logger.error("Unknown GPU: %s", gpu_id)
             return
 
         try:
-            # Convert percentage to PWM value (0-255)
-            pwm = int(self.config.INITIAL_FAN_PERCENT * 255 / 100)
-            self.fans[gpu_id]["pwm"].write_text(str(pwm))
+            self._write_fan_file(gpu_id, "pwm", self._initial_pwm_bytes)
+            self._last_pwm[gpu_id] = self._initial_pwm
             logger.info(
-                f"{Fore.CYAN}{gpu_id}: Set to initial speed: "
-                f"{self.config.INITIAL_FAN_PERCENT}%"
+                "%s%s: Set to initial speed: %s%%",
+                Fore.CYAN,
+                gpu_id,
+                self.config.INITIAL_FAN_PERCENT,
             )
         except IOError as e:
-            logger.error(f"Failed to set initial speed for GPU {gpu_id}: {e}")
+            logger.error("Failed to set initial speed for GPU %s: %s", gpu_id, e)
+
+    def update_fans(self, temps: Dict[str, Optional[int]]) -> None:
+        """Apply a temperature sample to all fans
+
+        Args:
+            temps: Dict mapping GPU IDs to temperatures in mK, None if unavailable
+        """
+        now = asyncio.get_running_loop().time()
+        debounce = self.config.DEBOUNCE_MS / 1000
+        hysteresis = self.config.HYSTERESIS
+        # Skip building the per-fan debug messages unless they are emitted
+        debug = logger.isEnabledFor(logging.DEBUG)
+        # Bound once per sample, these are looked up for every reference GPU
+        last_change = self.temp_at_last_change
+        last_write_ts = self._last_write_ts
+        recent_max = self._recent_max
+
+        # Decide once per reference GPU whether its fans need a new speed
+        targets: Dict[str, int] = {}
+        for ref_gpu in self._reference_gpus:
+            reading = temps.get(ref_gpu)
+            # Skip if we don't have temperature data for the reference GPU
+            if reading is None:
+                continue
+
+            # Inside the debounce window after a speed change, act on the
+            # highest reading seen since that change. Once the window has
+            # passed, follow the current reading again.
+            last_ts = last_write_ts.get(ref_gpu)
+            if last_ts is not None and now - last_ts < debounce:
+                temp = max(reading, recent_max.get(ref_gpu, reading))
+                recent_max[ref_gpu] = temp
+            else:
+                temp = reading
+                recent_max.pop(ref_gpu, None)
+
+            # Force update on first temperature reading after connection
+            should_update = (
+                ref_gpu not in last_change
+                or temp > last_change[ref_gpu]
+                or temp + hysteresis <= last_change[ref_gpu]
+            )
+
+            # Hold back changes inside the debounce window unless the
+            # temperature rose by more than the hysteresis
+            if should_update and ref_gpu in last_write_ts:
+                should_update = (
+                    now - last_write_ts[ref_gpu] >= debounce
+                    or temp - last_change[ref_gpu] > hysteresis
+                )
 
-    async def handle_client(self, reader, writer):
+            # Only show temperature updates in debug mode
+            if debug:
+                logger.debug("%s%s: %.1f°C", Fore.CYAN, ref_gpu, reading / 1000)
+
+            if should_update:
+                targets[ref_gpu] = temp
+                last_change[ref_gpu] = temp
+                last_write_ts[ref_gpu] = now
+                recent_max.pop(ref_gpu, None)
+            elif debug:
+                next_change_up = last_change[ref_gpu]
+                next_change_down = last_change[ref_gpu] - hysteresis
+                logger.debug(
+                    "%s%s Next change at: ↑%.1f°C ↓%.1f°C",
+                    Fore.YELLOW,
+                    ref_gpu,
+                    next_change_up / 1000,
+                    next_change_down / 1000,
+                )
+
+        pwms = self.interpolate_pwms(targets)
+
+        # Apply the new speeds to every fan following an updated GPU
+        updates: List[Tuple[str, int, int]] = []
+        for fan_id, ref_gpu, pwm_fd in self._fan_tuples:
+            if ref_gpu in pwms:
+                pwm = pwms[ref_gpu]
+                updates.append((fan_id, pwm, pwm_fd))
+                if debug:
+                    logger.debug(
+                        "%sFan %s (ref: %s): Updated fan speed: %.1f%%",
+                        Fore.GREEN,
+                        fan_id,
+                        ref_gpu,
+                        pwm / 255 * 100,
+                    )
+            elif debug and temps.get(ref_gpu) is not None:
+                current_pwm = self._last_pwm.get(fan_id, 0)
+                logger.debug(
+                    "%sFan %s (ref: %s): Current fan speed: %.1f%%",
+                    Fore.BLUE,
+                    fan_id,
+                    ref_gpu,
+                    current_pwm / 255 * 100,
+                )
+        self._write_pwms(updates)
+
+    def _reset_history(self) -> None:
+        """Forget past temperatures so the next sample sets all fan speeds"""
+        self.temp_at_last_change.clear()
+        self._last_write_ts.clear()
+        self._recent_max.clear()
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
         """Handle incoming temperature data from client"""
         client_addr = writer.get_extra_info("peername")
-        logger.debug(f"New client connection from {client_addr}")
+        logger.debug("New client connection from %s", client_addr)
 
         # Set all fans to manual mode and reset fan speeds
         for gpu_id in self.fans:
             self.set_fan_mode(gpu_id, 1)
-            # Reset temperature history for fresh start
-            if gpu_id in self.temp_at_last_change:
-                del self.temp_at_last_change[gpu_id]
-
-        try:
-            while True:
-                try:
-                    data = await asyncio.wait_for(reader.readline(), timeout=5.0)
-                    if not data:
-                        break
-
-                    try:
-                        message = json.loads(data.decode())
-                        temps = message["temperatures"]
-
-                        # Track which GPUs have been processed to avoid duplicate updates
-                        processed_gpus = set()
+        # Reset temperature history for fresh start
+        self._reset_history()
+
+        # GPU order of binary frames, set once the client sent its handshake
+        gpu_ids = None
+
+        # Deadline for the next message, pushed forward on every read. The
+        # watchdog timer only fires once per timeout period and rearms itself
+        # at the current deadline until it has actually passed. Once the
+        # failsafe speeds are applied to every fan it stays idle until the
+        # next message arrives, otherwise it retries every timeout period.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CLIENT_TIMEOUT
+        # Both are reassigned by the callbacks below, which mypy doesn't
+        # follow, so the casts keep it from narrowing them to their first value
+        watchdog_handle = cast(Optional[asyncio.TimerHandle], None)
+        failsafe_task = cast(Optional["asyncio.Task[None]"], None)
+
+        async def apply_failsafe() -> None:
+            nonlocal watchdog_handle
+            if not await self.set_failsafe_speeds() and watchdog_handle is None:
+                # Try again after another timeout period, unless data
+                # arrived meanwhile and rearmed the watchdog
+                watchdog_handle = loop.call_later(CLIENT_TIMEOUT, watchdog)
+
+        def watchdog() -> None:
+            nonlocal watchdog_handle, failsafe_task
+            if loop.time() < deadline:
+                watchdog_handle = loop.call_at(deadline, watchdog)
+                return
+            watchdog_handle = None
+            if failsafe_task is None:
+                # No data received within timeout, set failsafe speeds
+                logger.warning(
+                    "%sClient timeout - setting failsafe speeds", Fore.YELLOW
+                )
+            failsafe_task = asyncio.create_task(apply_failsafe())
 
-                        # Process each fan based on its reference GPU
-                        for fan_id, fan_info in self.fans.items():
-                            ref_gpu = fan_info["reference_gpu"]
+        watchdog_handle = cast(
+            Optional[asyncio.TimerHandle], loop.call_at(deadline, watchdog)
+        )
 
-                            # Skip if we don't have temperature data for the reference GPU
-                            if ref_gpu not in temps or temps[ref_gpu] is None:
-                                continue
+        # Bound once per connection, used for every message
+        time = loop.time
+        update_fans = self.update_fans
 
-                            temp = temps[ref_gpu]
+        try:
+            while True:
+                if gpu_ids is None:
+                    data = await reader.readline()
+                else:
+                    data = await read_frame(reader)
+                if not data:
+                    break
+                deadline = time() + CLIENT_TIMEOUT
+                if watchdog_handle is None:
+                    watchdog_handle = loop.call_at(deadline, watchdog)
+                if failsafe_task is not None:
+                    # Apply the fan curve again from scratch after a timeout,
+                    # once the failsafe writes can no longer overtake it
+                    await failsafe_task
+                    failsafe_task = None
+                    logger.info("%sClient data resumed", Fore.GREEN)
+                    self._reset_history()
 
-                            # Force update on first temperature reading after connection
-                            should_update = (
-                                ref_gpu not in self.temp_at_last_change
-                                or temp > self.temp_at_last_change[ref_gpu]
-                                or temp + self.config.HYSTERESIS
-                                <= self.temp_at_last_change[ref_gpu]
+                try:
+                    if gpu_ids is not None:
+                        temps = decode_frame(data, gpu_ids)
+                    else:
+                        message = decode_message(data)
+                        if isinstance(message, dict) and "gpu_ids" in message:
+                            gpu_ids = parse_hello(message)
+                            logger.debug(
+                                "Client %s reports GPUs: %s", client_addr, gpu_ids
                             )
+                            continue
+                        # Legacy JSON line protocol
+                        temps = parse_legacy(message)
 
-                            # Only show temperature updates in debug mode
-                            if ref_gpu not in processed_gpus:
-                                logger.debug(f"{Fore.CYAN}{ref_gpu}: {temp/1000:.1f}°C")
-                                processed_gpus.add(ref_gpu)
-
-                            if (
-                                ref_gpu in self.temp_at_last_change
-                                and ref_gpu not in processed_gpus
-                            ):
-                                next_change_up = self.temp_at_last_change[ref_gpu]
-                                next_change_down = (
-                                    self.temp_at_last_change[ref_gpu]
-                                    - self.config.HYSTERESIS
-                                )
-                                logger.debug(
-                                    f"{Fore.YELLOW}{ref_gpu} Next change at: "
-                                    f"↑{next_change_up/1000:.1f}°C "
-                                    f"↓{next_change_down/1000:.1f}°C"
-                                )
-
-                            if should_update:
-                                pwm = self.interpolate_pwm(temp)
-                                self.set_pwm(fan_id, pwm)
-                                self.temp_at_last_change[ref_gpu] = temp
-                                logger.debug(
-                                    f"{Fore.GREEN}Fan {fan_id} (ref: {ref_gpu}): "
-                                    f"Updated fan speed: {pwm/255*100:.1f}%"
-                                )
-                            else:
-                                current_pwm = int(
-                                    self.fans[fan_id]["pwm"].read_text().strip()
-                                )
-                                logger.debug(
-                                    f"{Fore.BLUE}Fan {fan_id} (ref: {ref_gpu}): "
-                                    f"Current fan speed: {current_pwm/255*100:.1f}%"
-                                )
-
-                    except json.JSONDecodeError as e:
-                        logger.error(
-                            f"{Fore.RED}[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Invalid message format: {e}"
-                        )
+                    update_fans(temps)
 
-                except asyncio.TimeoutError:
-                    # No data received within timeout, set failsafe speeds
-                    logger.warning(
-                        f"{Fore.YELLOW}Client timeout - setting failsafe speeds"
-                    )
-                    for gpu_id in self.fans:
-                        self.set_failsafe_speed(gpu_id)
-                    continue
+                except DecodeError as e:
+                    logger.error("%sInvalid message format: %s", Fore.RED, e)
 
         except asyncio.CancelledError:
             # Reset all fans to auto mode
@@ -436,34 +659,41 @@ class FanController:
             await writer.wait_closed()
             raise
         finally:
+            # A failed failsafe attempt may still schedule a retry, so let it
+            # finish before cancelling the watchdog
+            if failsafe_task is not None:
+                await failsafe_task
+            if watchdog_handle is not None:
+                watchdog_handle.cancel()
             # Set failsafe speeds before disconnecting
             for gpu_id in self.fans:
                 self.set_failsafe_speed(gpu_id)
 
-    async def set_failsafe_with_retry(self, gpu_id: str):
+    async def set_failsafe_with_retry(self, gpu_id: str) -> None:
         """Set failsafe speed with retry until successful"""
         while True:
             try:
-                # Convert percentage to PWM value (0-255)
-                pwm = int(self.config.FAILSAFE_FAN_PERCENT * 255 / 100)
-                self.fans[gpu_id]["pwm"].write_text(str(pwm))
+                self._write_fan_file(gpu_id, "pwm", self._failsafe_pwm_bytes)
+                self._last_pwm[gpu_id] = self._failsafe_pwm
                 logger.warning(
-                    f"{Fore.YELLOW}{gpu_id}: Set to failsafe speed: "
-                    f"{self.config.FAILSAFE_FAN_PERCENT}%"
+                    "%s%s: Set to failsafe speed: %s%%",
+                    Fore.YELLOW,
+                    gpu_id,
+                    self.config.FAILSAFE_FAN_PERCENT,
                 )
                 break
             except IOError as e:
-                logger.error(f"Failed to set failsafe speed for GPU {gpu_id}: {e}")
+                logger.error("Failed to set failsafe speed for GPU %s: %s", gpu_id, e)
                 await asyncio.sleep(1)  # Wait before retry
 
-    async def cleanup(self):
+    async def cleanup(self) -> None:
         """Clean up fan control on shutdown"""
         # First set all fans to automatic mode
         for gpu_id in self.fans:
             try:
                 self.set_fan_mode(gpu_id, 2)  # 2 = automatic mode
             except IOError as e:
-                logger.error(f"Failed to set automatic mode for GPU {gpu_id}: {e}")
+                logger.error("Failed to set automatic mode for GPU %s: %s", gpu_id, e)
 
         # Then try to set failsafe speeds
         tasks = []
@@ -473,9 +703,27 @@ class FanController:
 
         # Wait for all failsafe settings to complete
         await asyncio.gather(*tasks)
+        self.close()
+
+    def close(self) -> None:
+        """Close the persistent fan control file descriptors"""
+        for fan_id, fan_info in self.fans.items():
+            for key, fd in (
+                ("pwm_fd", fan_info.get("pwm_fd", -1)),
+                ("mode_fd", fan_info.get("mode_fd", -1)),
+            ):
+                if fd < 0:
+                    continue
+                try:
+                    os.close(fd)
+                except OSError as e:
+                    logger.error("Failed to close %s for fan %s: %s", key, fan_id, e)
+            fan_info["pwm_fd"] = fan_info["mode_fd"] = -1
+        # The descriptor numbers may be reused once closed
+        self._fan_tuples = []
 
 
-def parse_args():
+def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="AMD GPU Fan Controller Server")
     parser.add_argument(
         "--fan-config",
@@ -519,17 +767,30 @@ def parse_args():
         type=int,
         help="Initial fan speed percentage (0-100) before client connects",
     )
+    parser.add_argument(
+        "--debounce-ms",
+        type=int,
+        help="Minimum time in ms between fan speed changes (0 to disable)",
+    )
     return parser.parse_args()
 
 
-async def main():
+async def main() -> None:
+    configure_logging()
     args = parse_args()
 
     if args.debug:
         logger.setLevel(logging.DEBUG)
 
+    # Run the normal shutdown path (auto mode, failsafe, close files) on SIGTERM
+    main_task = asyncio.current_task()
+    if main_task is not None:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+
+    # Write the default config file on first run, then load it
+    FanControlConfig.bootstrap_config("server")
     config = FanControlConfig.load_config("server")
-    logger.info(f"{Fore.GREEN}Loading configuration...")
+    logger.info("%sLoading configuration...", Fore.GREEN)
 
     # Log config source
     config_path = None
@@ -543,16 +804,16 @@ async def main():
             break
 
     if config_path:
-        logger.info(f"{Fore.CYAN}Using config file: {config_path}")
+        logger.info("%sUsing config file: %s", Fore.CYAN, config_path)
     else:
-        logger.info(f"{Fore.YELLOW}Using default configuration")
+        logger.info("%sUsing default configuration", Fore.YELLOW)
 
     # Override with command line arguments
     if args.host:
-        logger.info(f"{Fore.YELLOW}Overriding host from command line: {args.host}")
+        logger.info("%sOverriding host from command line: %s", Fore.YELLOW, args.host)
         config.HOST = args.host
     if args.port:
-        logger.info(f"{Fore.YELLOW}Overriding port from command line: {args.port}")
+        logger.info("%sOverriding port from command line: %s", Fore.YELLOW, args.port)
         config.PORT = args.port
 
     # Handle hwmon configuration
@@ -566,8 +827,12 @@ async def main():
                 "mode_file": mode_file,
             }
             logger.info(
-                f"{Fore.YELLOW}Using hwmon configuration for {gpu_id}:"
-                f" {hwmon_name} ({pwm_file}, {mode_file})"
+                "%sUsing hwmon configuration for %s: %s (%s, %s)",
+                Fore.YELLOW,
+                gpu_id,
+                hwmon_name,
+                pwm_file,
+                mode_file,
             )
 
     # Handle both new and legacy arguments
@@ -577,22 +842,25 @@ async def main():
             gpu_id: (pwm_path, mode_path)
             for gpu_id, pwm_path, mode_path in args.fan_config
         }
-        logger.info(f"{Fore.YELLOW}Using fan configuration from command line:")
+        logger.info("%sUsing fan configuration from command line:", Fore.YELLOW)
         for gpu_id, (pwm, mode) in fan_configs.items():
-            logger.info(f"{Fore.CYAN}  {gpu_id}: PWM={pwm}, MODE={mode}")
+            logger.info("%s  %s: PWM=%s, MODE=%s", Fore.CYAN, gpu_id, pwm, mode)
     elif args.pwm_path and args.mode_path:
         # Legacy single-GPU support
         fan_configs = {"gpu0": (args.pwm_path, args.mode_path)}
         logger.info(
-            f"{Fore.YELLOW}Using legacy fan configuration: "
-            f"PWM={args.pwm_path}, MODE={args.mode_path}"
+            "%sUsing legacy fan configuration: PWM=%s, MODE=%s",
+            Fore.YELLOW,
+            args.pwm_path,
+            args.mode_path,
         )
 
     if args.failsafe_speed is not None:
         if 0 <= args.failsafe_speed <= 100:
             logger.info(
-                f"{Fore.YELLOW}Overriding failsafe speed from command line: "
-                f"{args.failsafe_speed}%"
+                "%sOverriding failsafe speed from command line: %s%%",
+                Fore.YELLOW,
+                args.failsafe_speed,
             )
             config.FAILSAFE_FAN_PERCENT = args.failsafe_speed
         else:
@@ -602,25 +870,43 @@ async def main():
     if args.initial_speed is not None:
         if 0 <= args.initial_speed <= 100:
             logger.info(
-                f"{Fore.YELLOW}Overriding initial speed from command line: "
-                f"{args.initial_speed}%"
+                "%sOverriding initial speed from command line: %s%%",
+                Fore.YELLOW,
+                args.initial_speed,
             )
             config.INITIAL_FAN_PERCENT = args.initial_speed
         else:
             logger.error("Initial speed must be between 0 and 100")
             return
 
+    if args.debounce_ms is not None:
+        if args.debounce_ms >= 0:
+            logger.info(
+                "%sOverriding debounce interval from command line: %sms",
+                Fore.YELLOW,
+                args.debounce_ms,
+            )
+            config.DEBOUNCE_MS = args.debounce_ms
+        else:
+            logger.error("Debounce interval must not be negative")
+            return
+
     try:
-        logger.info(f"\n{Fore.GREEN}Server configuration:")
+        logger.info("\n%sServer configuration:", Fore.GREEN)
+        logger.info(
+            "%sTemperature thresholds: %s°C",
+            Fore.CYAN,
+            [t / 1000 for t in config.TEMPS],
+        )
+        logger.info("%sPWM values: %s", Fore.CYAN, config.PWMS)
+        logger.info("%sHysteresis: %s°C", Fore.CYAN, config.HYSTERESIS / 1000)
+        logger.info("%sUpdate interval: %ss", Fore.CYAN, config.SLEEP_INTERVAL)
+        logger.info("%sNetwork: %s:%s", Fore.CYAN, config.HOST, config.PORT)
         logger.info(
-            f"{Fore.CYAN}Temperature thresholds: {[t/1000 for t in config.TEMPS]}°C"
+            "%sFailsafe fan speed: %s%%", Fore.CYAN, config.FAILSAFE_FAN_PERCENT
         )
-        logger.info(f"{Fore.CYAN}PWM values: {config.PWMS}")
-        logger.info(f"{Fore.CYAN}Hysteresis: {config.HYSTERESIS/1000}°C")
-        logger.info(f"{Fore.CYAN}Update interval: {config.SLEEP_INTERVAL}s")
-        logger.info(f"{Fore.CYAN}Network: {config.HOST}:{config.PORT}")
-        logger.info(f"{Fore.CYAN}Failsafe fan speed: {config.FAILSAFE_FAN_PERCENT}%")
-        logger.info(f"{Fore.CYAN}Initial fan speed: {config.INITIAL_FAN_PERCENT}%")
+        logger.info("%sInitial fan speed: %s%%", Fore.CYAN, config.INITIAL_FAN_PERCENT)
+        logger.info("%sDebounce interval: %sms", Fore.CYAN, config.DEBOUNCE_MS)
 
         controller = FanController(config, fan_configs)
 
@@ -628,15 +914,16 @@ async def main():
             controller.handle_client, config.HOST, config.PORT
         )
 
-        logger.info(f"\n{Fore.GREEN}Server running on {config.HOST}:{config.PORT}")
+        logger.info("\n%sServer running on %s:%s", Fore.GREEN, config.HOST, config.PORT)
 
         async with server:
             await server.serve_forever()
 
-    except KeyboardInterrupt:
-        logger.info(f"{Fore.YELLOW}Shutting down...")
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # SIGTERM cancels this task, stopping is not a failure
+        logger.info("%sShutting down...", Fore.YELLOW)
     except Exception as e:
-        logger.error(f"{Fore.RED}Fatal error: {e}")
+        logger.error("%sFatal error: %s", Fore.RED, e)
         raise
     finally:
         if "controller" in locals():
@@ -4,11 +4,11 @@ setup(
     name="remote_fancontrol",
     version="0.1.2",
     packages=find_packages(),
-    install_requires=[
-        "asyncio>=3.4.3",
-        "colorama>=0.4.6",
-    ],
+    install_requires=[],
     extras_require={
+        "fast": [
+            "orjson>=3.6.0",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "pytest-asyncio>=0.20.0",
@@ -25,5 +25,5 @@ setup(
             "remote-fancontrol-client=remote_fancontrol.client.temperature_monitor:main",
         ],
     },
-    python_requires=">=3.7",
+    python_requires=">=3.8",
 )
@@ -0,0 +1,115 @@
+import asyncio
+import os
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+from remote_fancontrol.client.temperature_monitor import TemperatureMonitor
+from remote_fancontrol.common.config import FanControlConfig
+from remote_fancontrol.server.fan_controller import FanController
+
+
+@pytest.fixture
+def config() -> FanControlConfig:
+    return FanControlConfig(
+        TEMPS=[35000, 55000, 80000, 90000],
+        PWMS=[0, 100, 153, 255],
+        HYSTERESIS=6000,
+        SLEEP_INTERVAL=1.0,
+        PORT=7777,
+        FAILSAFE_FAN_PERCENT=80,
+        INITIAL_FAN_PERCENT=0,
+    )
+
+
+@pytest.fixture
+async def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Control the time of the running event loop"""
+    now = [1000.0]
+    monkeypatch.setattr(asyncio.get_running_loop(), "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def pwrites(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[int, bytes]]:
+    """Record sysfs writes instead of relying on the fake files' contents"""
+    writes: List[Tuple[int, bytes]] = []
+    real_pwrite = os.pwrite
+
+    def pwrite(fd: int, data: bytes, offset: int) -> int:
+        writes.append((fd, bytes(data)))
+        return real_pwrite(fd, data, offset)
+
+    monkeypatch.setattr(os, "pwrite", pwrite)
+    return writes
+
+
+@pytest.fixture
+def make_controller(
+    tmp_path, config: FanControlConfig, pwrites
+) -> Callable[..., FanController]:
+    """Build a FanController driving plain files in place of sysfs attributes"""
+    controllers: List[FanController] = []
+
+    def make(fan_ids: Tuple[str, ...] = ("gpu0",), **overrides) -> FanController:
+        for key, value in overrides.items():
+            setattr(config, key, value)
+        fan_configs: Dict[str, Tuple[str, str]] = {}
+        for fan_id in fan_ids:
+            pwm = tmp_path / f"{fan_id}_pwm"
+            mode = tmp_path / f"{fan_id}_pwm_enable"
+            pwm.write_text("0\n")
+            mode.write_text("2\n")
+            fan_configs[fan_id] = (str(pwm), str(mode))
+        controller = FanController(config, fan_configs)
+        controllers.append(controller)
+        return controller
+
+    yield make
+    for controller in controllers:
+        controller.close()
+
+
+@pytest.fixture
+def written_pwms(pwrites) -> Callable[[FanController, str], List[int]]:
+    """Get the PWM values written to a fan, oldest first"""
+
+    def written(controller: FanController, fan_id: str) -> List[int]:
+        fd = controller.fans[fan_id]["pwm_fd"]
+        return [int(data) for write_fd, data in pwrites if write_fd == fd]
+
+    return written
+
+
+@pytest.fixture
+def written_pwm(written_pwms) -> Callable[[FanController, str], int]:
+    """Get the PWM value last written to a fan"""
+
+    def written(controller: FanController, fan_id: str) -> int:
+        return written_pwms(controller, fan_id)[-1]
+
+    return written
+
+
+@pytest.fixture
+def make_monitor(
+    tmp_path, config: FanControlConfig
+) -> Callable[..., TemperatureMonitor]:
+    """Build a TemperatureMonitor reading plain files in place of sysfs sensors"""
+    monitors: List[TemperatureMonitor] = []
+
+    def make(gpu_count: int = 1, **overrides) -> TemperatureMonitor:
+        for key, value in overrides.items():
+            setattr(config, key, value)
+        gpu_paths = []
+        for i in range(gpu_count):
+            sensor = tmp_path / f"gpu{i}_temp1_input"
+            sensor.write_text("45000\n")
+            gpu_paths.append(str(sensor))
+        monitor = TemperatureMonitor(config, gpu_paths)
+        monitors.append(monitor)
+        return monitor
+
+    yield make
+    for monitor in monitors:
+        monitor.close()
@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from remote_fancontrol.common import config as config_module
+from remote_fancontrol.common.config import FanControlConfig
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Point load_config at a single config file, with an empty cache"""
+    path = tmp_path / "fancontrol-server.json"
+    monkeypatch.setattr(
+        FanControlConfig, "_search_paths", staticmethod(lambda config_type: [path])
+    )
+    monkeypatch.setattr(FanControlConfig, "_file_cache", {})
+    return path
+
+
+def _write(path, **data) -> None:
+    path.write_text(json.dumps(data))
+
+
+class TestLoadConfig:
+    def test_unchanged_file_is_not_read_again(self, config_file, monkeypatch):
+        _write(config_file, port=7000, fans={"gpu0": {"pwm_path": "pwm1"}})
+        FanControlConfig.load_config()
+
+        def no_open(*args, **kwargs):
+            raise AssertionError("config file read again")
+
+        monkeypatch.setattr(config_module, "open", no_open, raising=False)
+        config = FanControlConfig.load_config()
+        assert config.PORT == 7000
+        assert config.fans == {"gpu0": {"pwm_path": "pwm1"}}
+
+    def test_resized_file_is_read_again(self, config_file):
+        _write(config_file, port=7000)
+        FanControlConfig.load_config()
+
+        _write(config_file, port=17000)
+        assert FanControlConfig.load_config().PORT == 17000
+
+    def test_touched_file_is_read_again(self, config_file):
+        _write(config_file, port=7000)
+        FanControlConfig.load_config()
+        mtime = config_file.stat().st_mtime_ns
+
+        # Same size, only the modification time tells the files apart
+        _write(config_file, port=7001)
+        os.utime(config_file, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+        assert FanControlConfig.load_config().PORT == 7001
+
+    def test_configs_do_not_share_state(self, config_file):
+        _write(
+            config_file,
+            temps=[40000, 60000],
+            pwms=[0, 255],
+            fans={"gpu0": {"pwm_path": "pwm1"}},
+        )
+        config = FanControlConfig.load_config()
+        config.TEMPS.append(90000)
+        config.fans["gpu0"]["pwm_path"] = "pwm2"
+
+        config = FanControlConfig.load_config()
+        assert config.TEMPS == [40000, 60000]
+        assert config.fans == {"gpu0": {"pwm_path": "pwm1"}}
@@ -0,0 +1,171 @@
+import asyncio
+import errno
+import os
+
+import pytest
+
+from remote_fancontrol.common.protocol import FrameEncoder, encode_hello
+from remote_fancontrol.server import fan_controller
+
+
+class TestUpdateFans:
+    async def test_follows_falling_temperature(
+        self, make_controller, written_pwm, clock
+    ):
+        controller = make_controller()
+        controller.update_fans({"gpu0": 85000})
+        assert written_pwm(controller, "gpu0") == 204
+
+        for temp in range(84000, 39000, -2000):
+            clock[0] += 1.0
+            controller.update_fans({"gpu0": temp})
+
+        # Last speed change at 42°C, the first reading a hysteresis step
+        # below the previous change at 48°C
+        assert written_pwm(controller, "gpu0") == 35
+
+    async def test_debounce_holds_falling_temperature(
+        self, make_controller, written_pwm, clock
+    ):
+        controller = make_controller(DEBOUNCE_MS=500)
+        controller.update_fans({"gpu0": 85000})
+
+        # A dip inside the debounce window is ignored
+        clock[0] += 0.1
+        controller.update_fans({"gpu0": 70000})
+        assert written_pwm(controller, "gpu0") == 204
+
+        # and followed once the window has passed
+        clock[0] += 0.5
+        controller.update_fans({"gpu0": 70000})
+        assert written_pwm(controller, "gpu0") == 131
+
+    async def test_debounce_passes_large_rise(
+        self, make_controller, written_pwm, clock
+    ):
+        controller = make_controller(DEBOUNCE_MS=500)
+        controller.update_fans({"gpu0": 60000})
+        clock[0] += 0.1
+        controller.update_fans({"gpu0": 80000})
+        assert written_pwm(controller, "gpu0") == 153
+
+    async def test_zero_debounce_disables_hold(
+        self, make_controller, written_pwm, clock
+    ):
+        controller = make_controller(DEBOUNCE_MS=0)
+        controller.update_fans({"gpu0": 85000})
+        controller.update_fans({"gpu0": 84000})
+        controller.update_fans({"gpu0": 70000})
+        assert written_pwm(controller, "gpu0") == 131
+        controller.update_fans({"gpu0": 40000})
+        assert written_pwm(controller, "gpu0") == 25
+
+    async def test_no_writes_after_close(self, make_controller, pwrites):
+        controller = make_controller()
+        controller.close()
+        count = len(pwrites)
+        controller.update_fans({"gpu0": 85000})
+        assert len(pwrites) == count
+
+
+class TestSetPwm:
+    def test_interpolates_curve(self, make_controller):
+        controller = make_controller()
+        assert controller.interpolate_pwm(30000) == 0
+        assert controller.interpolate_pwm(60000) == 110
+        assert controller.interpolate_pwm(95000) == 255
+
+    def test_skips_unchanged_value(self, make_controller, written_pwms):
+        controller = make_controller()
+        controller.set_pwm("gpu0", 110)
+        controller.set_pwm("gpu0", 110)
+        controller.set_pwm("gpu1", 110)
+        assert written_pwms(controller, "gpu0") == [0, 110]
+
+
+class _Writer:
+    """Stand-in for the StreamWriter handle_client gets"""
+
+    def get_extra_info(self, name: str) -> None:
+        return None
+
+
+class TestHandleClient:
+    async def test_binary_frames_after_hello(self, make_controller, written_pwms):
+        controller = make_controller(("gpu0", "gpu1"))
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_hello(["gpu1", "gpu0"]))
+        reader.feed_data(FrameEncoder(2).encode(0, 0.0, (60000, 70000)))
+        reader.feed_eof()
+
+        await controller.handle_client(reader, _Writer())
+
+        # Initial speed, the speed for the frame in handshake order, then the
+        # failsafe speed once the client disconnected
+        assert written_pwms(controller, "gpu0") == [0, 131, 204]
+        assert written_pwms(controller, "gpu1") == [0, 110, 204]
+
+    async def test_legacy_json_lines(self, make_controller, written_pwms):
+        controller = make_controller()
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'{"temperatures": {"gpu0": 60000}, "timestamp": 1.0}\n')
+        # Malformed lines are skipped without dropping the connection
+        for line in (
+            b"not json",
+            b"5",
+            b"[1]",
+            b'{"foo": 1}',
+            b'{"temperatures": [1]}',
+            b'{"temperatures": {"gpu0": "hot"}}',
+            b'{"gpu_ids": "x"}',
+        ):
+            reader.feed_data(line + b"\n")
+        reader.feed_data(b'{"temperatures": {"gpu0": 70000}, "timestamp": 2.0}\n')
+        reader.feed_eof()
+
+        await controller.handle_client(reader, _Writer())
+
+        assert written_pwms(controller, "gpu0") == [0, 110, 131, 204]
+
+
+class TestWatchdog:
+    async def test_retries_failed_failsafe(
+        self, make_controller, written_pwms, monkeypatch: pytest.MonkeyPatch
+    ):
+        monkeypatch.setattr(fan_controller, "CLIENT_TIMEOUT", 0.05)
+        controller = make_controller()
+        failsafe = controller._failsafe_pwm_bytes
+        pwm_fd = controller.fans["gpu0"]["pwm_fd"]
+        failures = [OSError(errno.EIO, "Input/output error")]
+        attempts = []
+        pwrite = os.pwrite
+
+        def flaky_pwrite(fd: int, data: bytes, offset: int) -> int:
+            if fd == pwm_fd and data == failsafe:
+                attempts.append(data)
+                if failures:
+                    raise failures.pop()
+            return pwrite(fd, data, offset)
+
+        monkeypatch.setattr(os, "pwrite", flaky_pwrite)
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'{"temperatures": {"gpu0": 60000}}\n')
+        task = asyncio.create_task(controller.handle_client(reader, _Writer()))
+
+        # The first attempt fails
+        await asyncio.sleep(0.08)
+        assert len(attempts) == 1
+        assert written_pwms(controller, "gpu0") == [0, 110]
+
+        # The retry one timeout period later succeeds
+        await asyncio.sleep(0.06)
+        assert len(attempts) == 2
+        assert written_pwms(controller, "gpu0") == [0, 110, 204]
+
+        # and is not repeated while the client stays silent
+        await asyncio.sleep(0.15)
+        assert len(attempts) == 2
+
+        reader.feed_eof()
+        await task
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from remote_fancontrol.common.protocol import (
+    TEMP_MISSING,
+    DecodeError,
+    FrameEncoder,
+    decode_frame,
+    decode_message,
+    encode_hello,
+    encode_message,
+    parse_hello,
+    parse_legacy,
+    read_frame,
+)
+
+
+def test_hello_round_trip():
+    data = encode_hello(["gpu0", "gpu1"])
+    assert data.endswith(b"\n")
+    assert parse_hello(decode_message(data)) == ["gpu0", "gpu1"]
+
+
+def test_invalid_hello():
+    with pytest.raises(DecodeError):
+        parse_hello({"gpu_ids": "gpu0"})
+
+
+def test_invalid_json():
+    with pytest.raises(DecodeError):
+        decode_message(b"{not json\n")
+
+
+async def test_frame_round_trip():
+    gpu_ids = ["gpu0", "gpu1"]
+    encoder = FrameEncoder(len(gpu_ids))
+    reader = asyncio.StreamReader()
+    reader.feed_data(encoder.encode(1, 1.5, (45000, 52000)))
+    # Unchanged temperatures reuse the packed block of the previous frame
+    reader.feed_data(encoder.encode(2, 2.5, (45000, 52000)))
+    reader.feed_data(encoder.encode(3, 3.5, (46000, None)))
+    reader.feed_eof()
+
+    assert decode_frame(await read_frame(reader), gpu_ids) == {
+        "gpu0": 45000,
+        "gpu1": 52000,
+    }
+    assert decode_frame(await read_frame(reader), gpu_ids) == {
+        "gpu0": 45000,
+        "gpu1": 52000,
+    }
+    assert decode_frame(await read_frame(reader), gpu_ids) == {
+        "gpu0": 46000,
+        "gpu1": None,
+    }
+    assert await read_frame(reader) == b""
+
+
+def test_missing_temperature():
+    frame = FrameEncoder(1).encode(0, 0.0, (None,))
+    # Failed reads go over the wire as the TEMP_MISSING sentinel
+    assert frame[-4:] == TEMP_MISSING.to_bytes(4, "little", signed=True)
+    assert decode_frame(frame[2:], ["gpu0"]) == {"gpu0": None}
+
+
+def test_sequence_number_wraps():
+    frame = FrameEncoder(1).encode(2**32 + 5, 0.0, (40000,))
+    assert frame[2:6] == (5).to_bytes(4, "little")
+
+
+def test_wrong_payload_size():
+    frame = FrameEncoder(2).encode(0, 0.0, (45000, 52000))
+    with pytest.raises(DecodeError):
+        decode_frame(frame[2:], ["gpu0"])
+
+
+async def test_truncated_frame():
+    reader = asyncio.StreamReader()
+    reader.feed_data(FrameEncoder(1).encode(0, 0.0, (40000,))[:-1])
+    reader.feed_eof()
+    assert await read_frame(reader) == b""
+
+
+def test_legacy_message_round_trip():
+    message = {"temperatures": {"gpu0": 45000, "gpu1": None}, "timestamp": 1.0}
+    data = encode_message(message)
+    assert data.endswith(b"\n")
+    assert decode_message(data) == message
+    assert parse_legacy(decode_message(data)) == {"gpu0": 45000, "gpu1": None}
+
+
+@pytest.mark.parametrize(
+    "message",
+    [5, [1], {"foo": 1}, {"temperatures": [1]}, {"temperatures": {"gpu0": "hot"}}],
+)
+def test_invalid_legacy_message(message):
+    with pytest.raises(DecodeError):
+        parse_legacy(message)
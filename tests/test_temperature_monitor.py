@@ -0,0 +1,200 @@
+import asyncio
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pytest
+
+from remote_fancontrol.client import temperature_monitor
+from remote_fancontrol.common.protocol import encode_hello
+
+_VALID = ({"gpu0": 45000}, True)
+_FAILED = ({"gpu0": None}, False)
+
+
+class _Writer:
+    """Stand-in for the StreamWriter monitor_loop sends on"""
+
+    def __init__(self) -> None:
+        self.writes: List[List[bytes]] = []
+
+    def writelines(self, data: List[bytes]) -> None:
+        self.writes.append(list(data))
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    async def wait_closed(self) -> None:
+        pass
+
+
+async def run_monitor_loop(
+    monitor,
+    clock: List[float],
+    monkeypatch: pytest.MonkeyPatch,
+    readings: List[Tuple[Dict[str, Optional[int]], bool]],
+    read_times: Sequence[float] = (),
+) -> Tuple[_Writer, List[float]]:
+    """Run monitor_loop over scripted readings on the fake clock
+
+    Reads take the matching read_times entry in seconds, or no time, and
+    sleeps advance the clock by their length. The loop is cancelled once
+    the readings are used up.
+
+    Returns:
+        The writer the frames were sent on and the requested sleep lengths
+    """
+    writer = _Writer()
+    sleeps: List[float] = []
+    readings = list(readings)
+    read_times = list(read_times)
+
+    async def connect() -> Tuple[None, _Writer]:
+        return None, writer
+
+    async def read_temperatures() -> Tuple[Dict[str, Optional[int]], bool]:
+        if not readings:
+            raise asyncio.CancelledError
+        if read_times:
+            clock[0] += read_times.pop(0)
+        return readings.pop(0)
+
+    async def sleep(delay: float) -> None:
+        sleeps.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr(monitor, "connect", connect)
+    monkeypatch.setattr(monitor, "read_temperatures", read_temperatures)
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    with pytest.raises(asyncio.CancelledError):
+        await monitor.monitor_loop()
+    return writer, sleeps
+
+
+class TestBatching:
+    async def test_full_batch_is_one_write(self, make_monitor, clock, monkeypatch):
+        monitor = make_monitor(BATCH_SIZE=3, BATCH_MAX_MS=60000)
+
+        writer, _ = await run_monitor_loop(monitor, clock, monkeypatch, [_VALID] * 7)
+
+        # The handshake goes out with the first batch, the incomplete third
+        # batch is still held back
+        assert [len(batch) for batch in writer.writes] == [4, 3]
+        assert writer.writes[0][0] == encode_hello(["gpu0"])
+        assert encode_hello(["gpu0"]) not in writer.writes[1]
+
+    async def test_flushes_after_batch_max_ms(self, make_monitor, clock, monkeypatch):
+        monitor = make_monitor(SLEEP_INTERVAL=1.0, BATCH_SIZE=10, BATCH_MAX_MS=2000)
+
+        writer, _ = await run_monitor_loop(monitor, clock, monkeypatch, [_VALID] * 3)
+
+        # Sampled 0s, 1s and 2s after the first frame
+        assert [len(batch) for batch in writer.writes] == [4]
+
+    async def test_flushes_after_failed_reads(self, make_monitor, clock, monkeypatch):
+        monitor = make_monitor(SLEEP_INTERVAL=1.0, BATCH_SIZE=10, BATCH_MAX_MS=2000)
+
+        writer, _ = await run_monitor_loop(
+            monitor, clock, monkeypatch, [_VALID, _FAILED, _FAILED]
+        )
+
+        assert [len(batch) for batch in writer.writes] == [2]
+
+
+class TestSchedule:
+    async def test_read_time_does_not_drift(self, make_monitor, clock, monkeypatch):
+        monitor = make_monitor(SLEEP_INTERVAL=1.0)
+
+        _, sleeps = await run_monitor_loop(
+            monitor, clock, monkeypatch, [_VALID] * 5, read_times=[0.3] * 5
+        )
+
+        assert sleeps == pytest.approx([0.7] * 5)
+
+    async def test_catches_up_short_delay(self, make_monitor, clock, monkeypatch):
+        monitor = make_monitor(SLEEP_INTERVAL=1.0)
+
+        _, sleeps = await run_monitor_loop(
+            monitor,
+            clock,
+            monkeypatch,
+            [_VALID] * 5,
+            read_times=[0.3, 0.3, 1.5, 0.3, 0.3],
+        )
+
+        # Back on the original schedule right after the slow read
+        assert sleeps == pytest.approx([0.7, 0.7, 0.0, 0.2, 0.7])
+
+    async def test_falling_behind_skips_missed_polls(
+        self, make_monitor, clock, monkeypatch
+    ):
+        monitor = make_monitor(SLEEP_INTERVAL=1.0)
+
+        _, sleeps = await run_monitor_loop(
+            monitor,
+            clock,
+            monkeypatch,
+            [_VALID] * 5,
+            read_times=[0.3, 0.3, 2.5, 0.3, 0.3],
+        )
+
+        # One immediate poll, then a full interval again instead of a burst
+        # of polls for the missed deadlines
+        assert sleeps == pytest.approx([0.7, 0.7, 0.0, 0.7, 0.7])
+
+
+class _Monitor:
+    """Stand-in for the TemperatureMonitor main() would start"""
+
+    started = False
+
+    def __init__(self, config, gpu_paths) -> None:
+        pass
+
+    async def monitor_loop(self) -> None:
+        _Monitor.started = True
+
+    def close(self) -> None:
+        pass
+
+
+class TestMain:
+    @pytest.mark.parametrize(
+        "batch_size, batch_max_ms, started",
+        [("10", "3000", True), ("10", "4500", False), ("1", "4500", True)],
+    )
+    async def test_checks_batch_delay_against_timeout(
+        self, config, monkeypatch, batch_size, batch_max_ms, started
+    ):
+        # The config fixture polls every second, so 4.5s of batch delay
+        # reaches the server timeout while batching is enabled
+        cls = temperature_monitor.FanControlConfig
+        monkeypatch.setattr(cls, "bootstrap_config", lambda config_type: None)
+        monkeypatch.setattr(cls, "load_config", lambda config_type: config)
+        monkeypatch.setattr(temperature_monitor, "TemperatureMonitor", _Monitor)
+        monkeypatch.setattr(_Monitor, "started", False)
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["client", "--batch-size", batch_size, "--batch-max-ms", batch_max_ms],
+        )
+
+        await temperature_monitor.main()
+
+        assert _Monitor.started == started
+
+
+class TestInit:
+    def test_no_sensors_registers_no_cleanup(self, config, tmp_path, monkeypatch):
+        registered = []
+        monkeypatch.setattr(temperature_monitor.atexit, "register", registered.append)
+        # No auto-detected GPU to fall back to either
+        monkeypatch.setattr(
+            temperature_monitor.TemperatureMonitor, "_detect_sensors", lambda self: {}
+        )
+
+        with pytest.raises(ValueError):
+            temperature_monitor.TemperatureMonitor(config, [str(tmp_path / "missing")])
+        assert registered == []